@@ -0,0 +1,211 @@
+# event_log.py
+# Gameplay event stream: cheap emit() on the frame thread, background writer to
+# size-rotated gzip files, and an offline reader (python event_log.py LOG_DIR)
+import gzip
+import glob
+import itertools
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+
+# -----------------------
+# Event kinds
+# -----------------------
+KILL = 0  # value: score gained
+DAMAGE = 1  # value: damage taken, detail: health left
+PICKUP = 2  # detail: power-up type index
+SPAWN = 3  # value: size, detail: 0 enemy / 1 power-up
+DEATH = 4  # value: final score
+DROPPED = 5  # value: events dropped since the previous DROPPED record (written by the writer)
+
+EVENT_NAMES = ['kill', 'damage', 'pickup', 'spawn', 'death', 'dropped']
+
+# -----------------------
+# File format
+# -----------------------
+# Each file: magic, version, record size, then fixed-size records (gzip compressed)
+LOG_MAGIC = b'SHEV'
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct('<4sHH')
+# kind, time (seconds since epoch), x, y, value, detail
+EVENT_RECORD = struct.Struct('<Bdfffh')
+
+# -----------------------
+# Event log (ring buffer + background writer)
+# -----------------------
+class EventLog:
+    """
+    Single producer (the frame thread) / single consumer (the writer thread) ring.
+    emit() only stores a tuple and bumps an index, it never waits: when the ring is
+    full the event is counted in `dropped` and discarded. head is only written by
+    the producer and tail only by the consumer, so no lock is needed.
+    """
+    def __init__(self, capacity=1 << 16):
+        assert capacity & (capacity - 1) == 0, "capacity must be a power of two"
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.ring = [None] * capacity  # preallocated slots
+        self.head = 0  # events emitted
+        self.tail = 0  # events handed to the writer
+        self.dropped = 0
+        self.running = False
+        self.thread = None
+        self.wake = threading.Event()
+
+    def emit(self, kind, x=0.0, y=0.0, value=0.0, detail=0):
+        if not self.running:
+            return
+        head = self.head
+        if head - self.tail > self.mask:
+            self.dropped += 1
+            return
+        self.ring[head & self.mask] = (kind, time.time(), x, y, value, detail)
+        self.head = head + 1
+
+    def start(self, directory, max_bytes=4 * 1024 * 1024, flush_interval=0.5):
+        """Start writing to directory, rotating to a new file after max_bytes (compressed)."""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.prefix = time.strftime('events-%Y%m%d-%H%M%S')
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='event-log-writer', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop accepting events, write out everything pending and close the file."""
+        if not self.running:
+            return
+        self.running = False
+        self.wake.set()
+        self.thread.join()
+
+    # ---- writer thread ----
+    def _run(self):
+        file_index = 0
+        raw, out = self._open(file_index)
+        reported = 0
+        while True:
+            stopping = not self.running
+            head = self.head
+            tail = self.tail
+            written = head != tail
+            if written:
+                start = tail & self.mask
+                end = head & self.mask
+                if start < end:
+                    batch = self.ring[start:end]
+                else:
+                    batch = self.ring[start:] + self.ring[:end]
+                self.tail = head  # slots are free again once copied out
+                out.write(b''.join(itertools.starmap(EVENT_RECORD.pack, batch)))
+
+            dropped = self.dropped
+            if dropped != reported:
+                out.write(EVENT_RECORD.pack(DROPPED, time.time(), 0, 0, dropped - reported, 0))
+                reported = dropped
+                written = True
+
+            if written:
+                # Sync flush: everything written so far can be read back even if the game is killed
+                out.flush(zlib.Z_SYNC_FLUSH)
+
+            if stopping:
+                break
+
+            # Size-based rotation (raw.tell() is the compressed size written so far)
+            if raw.tell() >= self.max_bytes:
+                out.close()
+                raw.close()
+                file_index += 1
+                raw, out = self._open(file_index)
+
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+        out.close()
+        raw.close()
+
+    def _open(self, index):
+        path = os.path.join(self.directory, f'{self.prefix}-{index:03d}.evlog.gz')
+        raw = open(path, 'wb')
+        out = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+        out.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, EVENT_RECORD.size))
+        out.flush(zlib.Z_SYNC_FLUSH)
+        return raw, out
+
+# -----------------------
+# Offline reader
+# -----------------------
+def read_events(path):
+    """
+    Yield (kind, time, x, y, value, detail) tuples from one log file. Decompressed
+    as a stream, so a file from a killed game (no gzip trailer, maybe a partly
+    written block) still yields everything up to the writer's last flush.
+    """
+    stream = zlib.decompressobj(16 + zlib.MAX_WBITS)  # gzip wrapper
+    data = bytearray()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            try:
+                data += stream.decompress(chunk)
+            except zlib.error:
+                break  # Damaged tail: keep what came before it
+            if stream.eof:
+                break
+    if len(data) < LOG_HEADER.size:
+        return  # Killed before the header reached the disk
+    magic, version, record_size = LOG_HEADER.unpack_from(data)
+    if magic != LOG_MAGIC:
+        raise ValueError(f"{path}: not an event log")
+    if version != LOG_VERSION or record_size != EVENT_RECORD.size:
+        raise ValueError(f"{path}: unsupported event log version {version}")
+    body = memoryview(data)[LOG_HEADER.size:]
+    # A stream cut off mid-record still yields its complete records
+    usable = len(body) - len(body) % record_size
+    yield from EVENT_RECORD.iter_unpack(body[:usable])
+
+def summarize(paths, power_up_types=('health', 'speed', 'rapidfire', 'damage')):
+    """Aggregate events from log files into plain counters."""
+    counts = Counter()
+    pickups = Counter()
+    kill_score = 0
+    damage_taken = 0
+    dropped = 0
+    first = last = None
+    for path in sorted(paths):
+        for kind, t, x, y, value, detail in read_events(path):
+            counts[EVENT_NAMES[kind]] += 1
+            if kind == KILL:
+                kill_score += value
+            elif kind == DAMAGE:
+                damage_taken += value
+            elif kind == PICKUP:
+                pickups[power_up_types[detail]] += 1
+            elif kind == DROPPED:
+                dropped += value
+            first = t if first is None else min(first, t)
+            last = t if last is None else max(last, t)
+    return {
+        'events': dict(counts),
+        'kill_score': int(kill_score),
+        'damage_taken': int(damage_taken),
+        'pickups': dict(pickups),
+        'dropped': int(dropped),
+        'duration': (last - first) if first is not None else 0.0,
+    }
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else 'logs'
+    summary = summarize(glob.glob(os.path.join(directory, '*.evlog.gz')))
+    print(f"Duration: {summary['duration']:.1f}s")
+    for name in EVENT_NAMES:
+        print(f"{name:>8}: {summary['events'].get(name, 0)}")
+    print(f"Score from kills: {summary['kill_score']}")
+    print(f"Damage taken: {summary['damage_taken']}")
+    print(f"Pickups: {summary['pickups']}")
+    print(f"Dropped events: {summary['dropped']}")
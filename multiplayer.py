@@ -0,0 +1,780 @@
+# multiplayer.py
+# Local multiplayer: an authoritative UDP server runs the game rules for several
+# players in one arena; clients send input frames and draw the snapshots they get back.
+#
+#   python multiplayer.py server --port 7777
+#   python multiplayer.py client --connect 127.0.0.1:7777
+#
+# Both sides accept --latency / --jitter (ms) and --loss (0..1) to simulate a bad
+# network on localhost.
+import argparse
+import heapq
+import math
+import random
+import socket
+import struct
+import time
+
+import pygame
+
+import shooter
+from shooter import (Bullet, Enemy, Player, PowerUp, Star, World, POWER_UP_TYPES, MOVE_KEYS,
+                     FPS, WIDTH, HEIGHT, WHITE, ORANGE, COARSE_INTERVAL, bullet_enemy_hits, draw_text)
+
+# -----------------------
+# Protocol
+# -----------------------
+MSG_JOIN = 0
+MSG_WELCOME = 1
+MSG_INPUT = 2
+MSG_SNAPSHOT = 3
+MSG_LEAVE = 4
+
+JOIN = struct.Struct('<B')
+LEAVE = struct.Struct('<B')
+WELCOME = struct.Struct('<BIiiI')  # type, player id, world width, world height, background seed
+# type, input seq, last snapshot tick received, MOVE_KEYS bitmask, click counter, aim x, aim y
+INPUT = struct.Struct('<BIIBBff')
+# type, tick, baseline tick (0 = none), player id, score, power-up type (-1 none),
+# power-up time, entity records, removed ids
+SNAPSHOT_HEADER = struct.Struct('<BIIIibHHH')
+
+# Entity record: id, field mask, [kind if new], then only the fields flagged in the mask
+ENTITY_ID = struct.Struct('<IB')
+FIELD_NEW = 0x80
+FIELD_STRUCTS = (struct.Struct('<h'), struct.Struct('<h'),  # x, y
+                 struct.Struct('<B'), struct.Struct('<B'),  # size, angle
+                 struct.Struct('<B'), struct.Struct('<3B'))  # health, color
+FIELD_COLOR = 5
+ALL_FIELDS = (1 << len(FIELD_STRUCTS)) - 1
+REMOVED_ID = struct.Struct('<I')
+
+KIND_PLAYER = 0
+KIND_ENEMY = 1
+KIND_BULLET = 2
+KIND_POWER_UP = 3  # + index into POWER_UP_TYPES
+
+MAX_PACKET = 1200  # Stay under a typical MTU
+SNAPSHOT_INTERVAL = 2  # Ticks between snapshots (30 per second)
+HISTORY_TICKS = 64  # How far back a baseline may be
+CLIENT_TIMEOUT = 5.0  # Seconds of silence before a client is dropped
+RESPAWN_TICKS = 180
+
+# Interest management: each client only hears about entities within its view (plus a margin)
+INTEREST_HALF_WIDTH = WIDTH // 2 + 200
+INTEREST_HALF_HEIGHT = HEIGHT // 2 + 200
+INTEREST_CELL = 400
+
+# Simulation level of detail (like parked chunks in large arena mode): enemies inside a
+# player's interest area update every tick, ones within COARSE_DISTANCE every
+# COARSE_INTERVAL ticks (staggered by grid cell), anything farther waits for a player
+COARSE_DISTANCE = shooter.LOAD_RADIUS * shooter.CHUNK_SIZE
+HIT_MARGIN = 100  # Largest enemy radius + bullet size + one tick of enemy movement
+
+def entity_state(obj):
+    """Quantized (kind, fields) of a server entity, as sent on the wire."""
+    x = max(-32768, min(32767, int(round(obj.x))))
+    y = max(-32768, min(32767, int(round(obj.y))))
+    size = max(0, min(255, int(obj.size)))
+    if isinstance(obj, Player):
+        angle = int(obj.angle % (2 * math.pi) / (2 * math.pi) * 256) & 255
+        return KIND_PLAYER, (x, y, size, angle, max(0, min(255, int(obj.health))), obj.color)
+    if isinstance(obj, Enemy):
+        return KIND_ENEMY, (x, y, size, 0, 0, obj.color)
+    if isinstance(obj, Bullet):
+        return KIND_BULLET, (x, y, size, 0, 0, ORANGE)
+    angle = int(obj.angle % (2 * math.pi) / (2 * math.pi) * 256) & 255
+    return KIND_POWER_UP + POWER_UP_TYPES.index(obj.type), (x, y, size, angle, 0, obj.color)
+
+def encode_entity(out, eid, kind, state, base):
+    """Append eid's record to out, delta against base (kind, state) or None; False if unchanged."""
+    if base is None:
+        mask = FIELD_NEW | ALL_FIELDS
+    else:
+        mask = 0
+        for bit, (value, old) in enumerate(zip(state, base[1])):
+            if value != old:
+                mask |= 1 << bit
+        if not mask:
+            return False
+    out += ENTITY_ID.pack(eid, mask)
+    if mask & FIELD_NEW:
+        out.append(kind)
+    for bit, field in enumerate(FIELD_STRUCTS):
+        if mask & (1 << bit):
+            out += field.pack(*state[bit]) if bit == FIELD_COLOR else field.pack(state[bit])
+    return True
+
+def decode_snapshot(data, snapshots):
+    """
+    Decode a snapshot packet against the client's stored snapshots.
+    Returns (header tuple, entities) or None when the baseline is not available.
+    """
+    header = SNAPSHOT_HEADER.unpack_from(data)
+    _, tick, baseline, _, _, _, _, n_records, n_removed = header
+    if baseline:
+        if baseline not in snapshots:
+            return None
+        entities = dict(snapshots[baseline])
+    else:
+        entities = {}
+
+    offset = SNAPSHOT_HEADER.size
+    for _ in range(n_records):
+        eid, mask = ENTITY_ID.unpack_from(data, offset)
+        offset += ENTITY_ID.size
+        if mask & FIELD_NEW:
+            kind = data[offset]
+            offset += 1
+            state = [None] * len(FIELD_STRUCTS)
+        else:
+            kind, state = entities[eid]
+            state = list(state)
+        for bit, field in enumerate(FIELD_STRUCTS):
+            if mask & (1 << bit):
+                values = field.unpack_from(data, offset)
+                state[bit] = values if bit == FIELD_COLOR else values[0]
+                offset += field.size
+        entities[eid] = (kind, tuple(state))
+    for _ in range(n_removed):
+        entities.pop(REMOVED_ID.unpack_from(data, offset)[0], None)
+        offset += REMOVED_ID.size
+    return header, entities
+
+# -----------------------
+# Simulated network (latency / jitter / loss on everything sent)
+# -----------------------
+class LossyChannel:
+    def __init__(self, sock, latency=0.0, jitter=0.0, loss=0.0):
+        self.sock = sock
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random()  # Separate from the game's random state
+        self.pending = []  # heap of (due time, order, data, addr)
+        self.order = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, data, addr):
+        self.sent += 1
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        if not self.latency and not self.jitter:
+            self._sendto(data, addr)
+            return
+        delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        self.order += 1
+        heapq.heappush(self.pending, (time.monotonic() + delay, self.order, data, addr))
+
+    def pump(self):
+        """Send delayed packets that are due."""
+        now = time.monotonic()
+        while self.pending and self.pending[0][0] <= now:
+            _, _, data, addr = heapq.heappop(self.pending)
+            self._sendto(data, addr)
+
+    def receive(self):
+        """Yield (data, addr) for every datagram waiting on the socket."""
+        while True:
+            try:
+                yield self.sock.recvfrom(65536)
+            except BlockingIOError:
+                return
+            except OSError:
+                continue  # e.g. ICMP port unreachable from a client that went away
+
+    def _sendto(self, data, addr):
+        try:
+            self.sock.sendto(data, addr)
+        except OSError:
+            pass
+
+def open_socket(host='0.0.0.0', port=0):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+# -----------------------
+# Server
+# -----------------------
+class SpatialGrid:
+    """
+    Uniform grid over every server entity, kept up to date as things spawn, move
+    and die, so per-client and per-player work only costs the cells around them.
+    """
+    def __init__(self, cell=INTEREST_CELL):
+        self.cell = cell
+        self.cells = {}  # (cx, cy) -> {obj: None}, an insertion-ordered set
+        self.homes = {}  # obj -> key of the cell it is filed under
+
+    def __contains__(self, obj):
+        return obj in self.homes
+
+    def key(self, x, y):
+        return int(x // self.cell), int(y // self.cell)
+
+    def insert(self, obj):
+        key = self.homes[obj] = self.key(obj.x, obj.y)
+        self.cells.setdefault(key, {})[obj] = None
+
+    def remove(self, obj):
+        key = self.homes.pop(obj)
+        cell = self.cells[key]
+        del cell[obj]
+        if not cell:
+            del self.cells[key]
+
+    def move(self, obj):
+        """Refile obj after it moved (cheap when it stayed in its cell)."""
+        if self.key(obj.x, obj.y) != self.homes[obj]:
+            self.remove(obj)
+            self.insert(obj)
+
+    def keys_around(self, x, y, half_w, half_h):
+        cell = self.cell
+        return [(cx, cy)
+                for cx in range(int((x - half_w) // cell), int((x + half_w) // cell) + 1)
+                for cy in range(int((y - half_h) // cell), int((y + half_h) // cell) + 1)]
+
+    def in_cells(self, keys, cls):
+        """Objects of cls filed under any of keys."""
+        cells = self.cells
+        return [obj for key in keys if key in cells for obj in cells[key] if type(obj) is cls]
+
+    def query(self, x, y, half_w, half_h):
+        cell = self.cell
+        cells = self.cells
+        found = []
+        for key in self.keys_around(x, y, half_w, half_h):
+            if key not in cells:
+                continue
+            x0 = key[0] * cell
+            y0 = key[1] * cell
+            if x - half_w <= x0 and x0 + cell <= x + half_w and y - half_h <= y0 and y0 + cell <= y + half_h:
+                found.extend(cells[key])  # Cell entirely inside the box
+            else:
+                found.extend(obj for obj in cells[key] if abs(obj.x - x) <= half_w and abs(obj.y - y) <= half_h)
+        return found
+
+    def nearest(self, obj, candidates, cache):
+        """Candidate nearest to obj's cell center, worked out once per cell (cache: key -> candidate)."""
+        key = self.homes[obj]
+        found = cache.get(key)
+        if found is None:
+            x = (key[0] + 0.5) * self.cell
+            y = (key[1] + 0.5) * self.cell
+            found = cache[key] = min(candidates, key=lambda c: (c.x - x) ** 2 + (c.y - y) ** 2)
+        return found
+
+class RemoteClient:
+    def __init__(self, player_id, addr):
+        self.player_id = player_id
+        self.addr = addr
+        self.player = None
+        self.score = 0
+        self.respawn = 0
+        self.keys = {key: False for key in MOVE_KEYS}
+        self.aim = (0.0, 0.0)
+        self.clicks = None
+        self.input_seq = 0  # Newest input applied; older ones arrive late and are dropped
+        self.acked = 0  # Newest snapshot tick the client confirmed
+        self.history = {}  # tick -> {id: (kind, state)} as the client will have it
+        self.last_heard = time.monotonic()
+        self.view = (0.0, 0.0)  # Where the client is looking (kept while respawning)
+
+    def spawn(self):
+        player = Player()
+        player.x = random.randint(player.size, shooter.WORLD_WIDTH - player.size)
+        player.y = random.randint(player.size, shooter.WORLD_HEIGHT - player.size)
+        player.net_id = self.player_id
+        player.color = shooter.BLUE
+        self.player = player
+        self.aim = (player.x + 1, player.y)
+
+class ArenaServer:
+    def __init__(self, host='0.0.0.0', port=7777, world_size=(4000, 3000), latency=0.0, jitter=0.0, loss=0.0):
+        shooter.set_world_size(world_size)
+        self.channel = LossyChannel(open_socket(host, port), latency, jitter, loss)
+        self.clients = {}  # addr -> RemoteClient
+        self.next_id = 1
+        self.tick = 0
+        self.grid = SpatialGrid()
+        self.world_seed = random.getrandbits(32)  # Clients build the same chunked background from it
+
+        # Game objects (enemies is a set: there can be thousands and removal must stay cheap)
+        self.bullets = []
+        self.enemies = set()
+        self.power_ups = []
+
+        # Game variables
+        self.enemy_spawn_timer = 0
+        self.enemy_spawn_delay = 60  # Frames between enemy spawns (per player)
+        self.power_up_spawn_timer = 0
+        self.power_up_spawn_interval = 600
+
+        # Stats
+        self.snapshot_bytes = 0
+        self.snapshot_count = 0
+
+    def new_id(self, obj=None):
+        eid = self.next_id
+        self.next_id += 1
+        if obj is not None:
+            obj.net_id = eid
+        return eid
+
+    def run(self):
+        frame_time = 1.0 / FPS
+        next_frame = time.perf_counter()
+        next_report = time.monotonic() + 5
+        while True:
+            self.receive()
+            self.update()
+            if self.tick % SNAPSHOT_INTERVAL == 0:
+                self.send_snapshots()
+            self.channel.pump()
+
+            if time.monotonic() >= next_report:
+                self.report()
+                next_report += 5
+
+            next_frame += frame_time
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.perf_counter()
+
+    def report(self):
+        average = self.snapshot_bytes / self.snapshot_count if self.snapshot_count else 0
+        print(f"tick {self.tick}: {len(self.clients)} clients, {len(self.enemies)} enemies, "
+              f"{len(self.bullets)} bullets, avg snapshot {average:.0f} bytes")
+        self.snapshot_bytes = self.snapshot_count = 0
+
+    # ---- input ----
+    def receive(self):
+        now = time.monotonic()
+        for data, addr in self.channel.receive():
+            if not data:
+                continue
+            client = self.clients.get(addr)
+            if data[0] == MSG_JOIN:
+                if client is None:
+                    client = self.clients[addr] = RemoteClient(self.new_id(), addr)
+                    self.spawn_player(client)
+                    print(f"player {client.player_id} joined from {addr[0]}:{addr[1]}")
+                # Answer every JOIN: the first WELCOME may have been lost
+                self.channel.send(WELCOME.pack(MSG_WELCOME, client.player_id, shooter.WORLD_WIDTH,
+                                               shooter.WORLD_HEIGHT, self.world_seed), addr)
+            elif client is None:
+                continue
+            elif data[0] == MSG_INPUT and len(data) == INPUT.size:
+                _, seq, ack, bits, clicks, aim_x, aim_y = INPUT.unpack(data)
+                if seq <= client.input_seq:
+                    continue  # Reordered by jitter: newer keys, aim and clicks are already applied
+                client.input_seq = seq
+                client.keys = {key: bool(bits >> i & 1) for i, key in enumerate(MOVE_KEYS)}
+                client.aim = (aim_x, aim_y)
+                if client.clicks is not None and clicks != client.clicks and client.player:
+                    fired = []
+                    client.player.shoot(fired, [])  # Muzzle flash particles are client-side only
+                    for bullet in fired:
+                        self.new_id(bullet)
+                        bullet.owner = client
+                        self.grid.insert(bullet)
+                    self.bullets.extend(fired)
+                client.clicks = clicks
+                if ack > client.acked and ack in client.history:
+                    client.acked = ack
+                    # Older snapshots can never be a baseline again
+                    for tick in [t for t in client.history if t < ack]:
+                        del client.history[tick]
+            elif data[0] == MSG_LEAVE:
+                print(f"player {client.player_id} left")
+                self.drop_client(client)
+                continue
+            client.last_heard = now
+
+        for addr, client in list(self.clients.items()):
+            if now - client.last_heard > CLIENT_TIMEOUT:
+                print(f"player {client.player_id} timed out")
+                self.drop_client(client)
+
+    def drop_client(self, client):
+        del self.clients[client.addr]
+        if client.player:
+            self.grid.remove(client.player)
+
+    # ---- game rules ----
+    def update(self):
+        self.tick += 1
+        players = [c.player for c in self.clients.values() if c.player]
+
+        grid = self.grid
+
+        if not self.clients:
+            # Empty arena: start fresh when someone joins
+            self.bullets = []
+            self.enemies = set()
+            self.power_ups = []
+            self.grid = SpatialGrid()
+            return
+
+        # Update players and respawn dead ones
+        for client in self.clients.values():
+            if client.player:
+                client.player.update(client.keys, client.aim)
+                grid.move(client.player)
+            else:
+                client.respawn -= 1
+                if client.respawn <= 0:
+                    self.spawn_player(client)
+
+        # Move bullets (ones that left the world or expired still get their last segment tested)
+        expired = []
+        for bullet in self.bullets:
+            if bullet.update():
+                expired.append(bullet)
+            grid.move(bullet)
+
+        # Spawn enemies and power-ups around a random player (more players, more enemies)
+        if players:
+            self.enemy_spawn_timer += len(players)
+            if self.enemy_spawn_timer >= self.enemy_spawn_delay:
+                target = random.choice(players)
+                shooter.camera.follow(target.x, target.y)
+                enemy = Enemy()
+                self.new_id(enemy)
+                self.enemies.add(enemy)
+                grid.insert(enemy)
+                self.enemy_spawn_timer = 0
+                # Decrease spawn delay over time for difficulty increase
+                self.enemy_spawn_delay = max(10, self.enemy_spawn_delay - 0.2)
+
+            self.power_up_spawn_timer += 1
+            if self.power_up_spawn_timer >= self.power_up_spawn_interval:
+                target = random.choice(players)
+                shooter.camera.follow(target.x, target.y)
+                power_up = PowerUp()
+                self.new_id(power_up)
+                self.power_ups.append(power_up)
+                grid.insert(power_up)
+                self.power_up_spawn_timer = 0
+
+        # Update power-ups (first player to touch one gets it)
+        for power_up in self.power_ups[:]:
+            if power_up.update():
+                self.power_ups.remove(power_up)
+                grid.remove(power_up)
+                continue
+            for player in players:
+                if math.hypot(power_up.x - player.x, power_up.y - player.y) < power_up.size + player.size // 2:
+                    power_up.apply(player)
+                    player.power_up_time = 600
+                    player.power_up_type = power_up.type
+                    self.power_ups.remove(power_up)
+                    grid.remove(power_up)
+                    break
+
+        # Update enemies: chase the player nearest to their cell, at full rate only near players
+        full_rate, coarse = self.enemies_to_update(players)
+        targets = {}
+        for enemy in coarse:
+            target = grid.nearest(enemy, players, targets)
+            enemy.update(target.x, target.y, steps=COARSE_INTERVAL)
+            enemy.prev_x, enemy.prev_y = enemy.x, enemy.y  # No swept path across the jump
+            grid.move(enemy)
+        for enemy in full_rate:
+            if not players:
+                break
+            target = grid.nearest(enemy, players, targets)
+            enemy.update(target.x, target.y)
+            grid.move(enemy)
+            if math.hypot(enemy.x - target.x, enemy.y - target.y) < enemy.size + target.size // 2:
+                if target.take_damage(10):
+                    self.kill_player(target)
+                    players.remove(target)
+                    targets = {}  # Pick again among the players that are left
+                self.remove_enemy(enemy)
+
+        # Check bullet collisions (swept against the enemies near each bullet's path), credit the shooter
+        candidates = {}
+        for bullet in self.bullets:
+            keys = grid.keys_around((bullet.prev_x + bullet.x) / 2, (bullet.prev_y + bullet.y) / 2,
+                                    abs(bullet.x - bullet.prev_x) / 2 + HIT_MARGIN,
+                                    abs(bullet.y - bullet.prev_y) / 2 + HIT_MARGIN)
+            candidates.update(dict.fromkeys(grid.in_cells(keys, Enemy)))
+        for bullet, enemy in bullet_enemy_hits(self.bullets, list(candidates)):
+            if bullet not in grid or enemy not in grid:
+                continue  # Bullet already hit something / enemy already killed this tick
+            if enemy.take_damage(bullet.damage):
+                bullet.owner.score += int(enemy.size)
+                self.remove_enemy(enemy)
+            self.remove_bullet(bullet)
+        for bullet in expired:
+            if bullet in grid:
+                self.remove_bullet(bullet)
+
+    def enemies_to_update(self, players):
+        """(full_rate, coarse) enemies for this tick, by grid cell distance from the players."""
+        grid = self.grid
+        phase = self.tick % COARSE_INTERVAL
+        full_keys = set()
+        coarse_keys = set()
+        for player in players:
+            full_keys.update(grid.keys_around(player.x, player.y, INTEREST_HALF_WIDTH, INTEREST_HALF_HEIGHT))
+            coarse_keys.update(key for key in grid.keys_around(player.x, player.y, COARSE_DISTANCE, COARSE_DISTANCE)
+                               if (key[0] + key[1]) % COARSE_INTERVAL == phase)
+        # Collect first: enemies change cells while they are updated
+        return grid.in_cells(full_keys, Enemy), grid.in_cells(coarse_keys - full_keys, Enemy)
+
+    def spawn_player(self, client):
+        client.spawn()
+        self.grid.insert(client.player)
+
+    def remove_enemy(self, enemy):
+        self.enemies.remove(enemy)
+        self.grid.remove(enemy)
+
+    def remove_bullet(self, bullet):
+        self.bullets.remove(bullet)
+        self.grid.remove(bullet)
+
+    def kill_player(self, player):
+        for client in self.clients.values():
+            if client.player is player:
+                self.grid.remove(player)
+                client.player = None
+                client.respawn = RESPAWN_TICKS
+                client.score = 0
+
+    # ---- snapshots ----
+    def send_snapshots(self):
+        # The grid is kept current by update(), so there is nothing to rebuild here
+        for client in self.clients.values():
+            self.send_snapshot(client)
+
+    def send_snapshot(self, client):
+        baseline = client.history.get(client.acked) if self.tick - client.acked < HISTORY_TICKS else None
+        base = baseline or {}
+        sent = dict(base)
+
+        # Entities this client can see, nearest first (they win if the packet fills up)
+        player = client.player
+        if player:
+            client.view = (player.x, player.y)
+        view_x, view_y = client.view
+        nearby = self.grid.query(view_x, view_y, INTEREST_HALF_WIDTH, INTEREST_HALF_HEIGHT)
+        nearby.sort(key=lambda o: (o.x - view_x) ** 2 + (o.y - view_y) ** 2)
+        visible = {obj.net_id for obj in nearby}
+
+        removed = [eid for eid in base if eid not in visible]
+        removed = removed[:(MAX_PACKET // 4) // REMOVED_ID.size]  # The rest go next time
+        budget = MAX_PACKET - SNAPSHOT_HEADER.size - len(removed) * REMOVED_ID.size
+
+        body = bytearray()
+        records = 0
+        for obj in nearby:
+            kind, state = entity_state(obj)
+            start = len(body)
+            if not encode_entity(body, obj.net_id, kind, state, base.get(obj.net_id)):
+                continue
+            if len(body) > budget:
+                del body[start:]
+                break  # Farther entities wait for the next snapshot
+            sent[obj.net_id] = (kind, state)
+            records += 1
+        for eid in removed:
+            del sent[eid]
+            body += REMOVED_ID.pack(eid)
+
+        power_up_type = -1
+        power_up_time = 0
+        if player and player.power_up_type:
+            power_up_type = POWER_UP_TYPES.index(player.power_up_type)
+            power_up_time = player.power_up_time
+        header = SNAPSHOT_HEADER.pack(MSG_SNAPSHOT, self.tick, client.acked if baseline is not None else 0,
+                                      client.player_id, client.score, power_up_type, power_up_time,
+                                      records, len(removed))
+        client.history[self.tick] = sent
+        # Without acks (heavy loss) old entries would pile up
+        for tick in [t for t in client.history if t <= self.tick - HISTORY_TICKS]:
+            del client.history[tick]
+        self.channel.send(header + body, client.addr)
+        self.snapshot_bytes += len(header) + len(body)
+        self.snapshot_count += 1
+
+# -----------------------
+# Client
+# -----------------------
+class ArenaClient:
+    def __init__(self, server_addr, latency=0.0, jitter=0.0, loss=0.0):
+        self.server_addr = server_addr
+        self.channel = LossyChannel(open_socket(), latency, jitter, loss)
+        self.player_id = None
+        self.world_seed = None
+        self.snapshots = {}  # tick -> {id: (kind, state)}
+        self.latest = 0
+        self.entities = {}
+        self.score = 0
+        self.power_up_type = None
+        self.power_up_time = 0
+        self.input_seq = 0
+
+    def connect(self, timeout=5.0):
+        """Send JOIN until the server answers; returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        next_join = 0
+        while time.monotonic() < deadline:
+            if time.monotonic() >= next_join:
+                self.channel.send(JOIN.pack(MSG_JOIN), self.server_addr)
+                next_join = time.monotonic() + 0.5
+            self.channel.pump()
+            for data, _ in self.channel.receive():
+                if data and data[0] == MSG_WELCOME and len(data) == WELCOME.size:
+                    _, self.player_id, world_width, world_height, self.world_seed = WELCOME.unpack(data)
+                    shooter.set_world_size((world_width, world_height))
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def leave(self):
+        self.channel.send(LEAVE.pack(MSG_LEAVE), self.server_addr)
+        self.channel.pump()
+
+    def send_input(self, key_bits, clicks, aim):
+        self.input_seq += 1
+        self.channel.send(INPUT.pack(MSG_INPUT, self.input_seq, self.latest, key_bits, clicks & 255,
+                                     aim[0], aim[1]), self.server_addr)
+        self.channel.pump()
+
+    def receive(self):
+        for data, _ in self.channel.receive():
+            if not data or data[0] != MSG_SNAPSHOT:
+                continue
+            decoded = decode_snapshot(data, self.snapshots)
+            if decoded is None:
+                continue  # Baseline already forgotten; a newer full snapshot will follow
+            header, entities = decoded
+            tick = header[1]
+            self.snapshots[tick] = entities
+            if tick > self.latest:
+                self.latest = tick
+                self.entities = entities
+                _, _, _, _, self.score, power_up_type, self.power_up_time, _, _ = header
+                self.power_up_type = POWER_UP_TYPES[power_up_type] if power_up_type >= 0 else None
+        for tick in [t for t in self.snapshots if t < self.latest - HISTORY_TICKS]:
+            del self.snapshots[tick]
+
+    @property
+    def own_player(self):
+        entity = self.entities.get(self.player_id)
+        return entity[1] if entity else None
+
+ENTITY_CLASSES = {KIND_PLAYER: Player, KIND_ENEMY: Enemy, KIND_BULLET: Bullet}  # Anything else is a power-up
+
+def draw_entities(entities):
+    """Draw decoded entities with the regular draw() methods (power-ups first, players last)."""
+    groups = {PowerUp: [], Bullet: [], Enemy: [], Player: []}
+    for eid, (kind, state) in sorted(entities.items(), key=lambda item: -item[1][0]):
+        groups[ENTITY_CLASSES.get(kind, PowerUp)].append((eid, kind) + state)
+    for cls, group in groups.items():
+        if not group:
+            continue
+        eids, kinds, x, y, size, angle, health, color = zip(*group)
+        columns = {'x': x, 'y': y, 'size': size, 'color': color,
+                   'angle': [a / 256 * 2 * math.pi for a in angle],
+                   'seed': [eid * 7.31 % 1000 for eid in eids]}
+        if cls is Player:
+            columns['health'] = health
+            columns['max_health'] = [100] * len(group)
+        elif cls is PowerUp:
+            columns['type'] = [POWER_UP_TYPES[kind - KIND_POWER_UP] for kind in kinds]
+        for obj in shooter.bare_objects(cls, columns):
+            obj.draw()
+
+def run_client(server_addr, latency=0.0, jitter=0.0, loss=0.0):
+    shooter.init_display()
+    client = ArenaClient(server_addr, latency, jitter, loss)
+    print(f"connecting to {server_addr[0]}:{server_addr[1]}...")
+    if not client.connect():
+        print("no answer from server")
+        pygame.quit()
+        return
+
+    stars = [Star() for _ in range(120)]
+    background = World(client.world_seed)  # Nebulas spread over the whole arena, loaded around the camera
+    effects = shooter.PostEffects()
+    clicks = 0
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                running = False
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                clicks += 1
+
+        keys = pygame.key.get_pressed()
+        key_bits = sum(1 << i for i, key in enumerate(MOVE_KEYS) if keys[key])
+        client.send_input(key_bits, clicks, shooter.camera.to_world(*pygame.mouse.get_pos()))
+        client.receive()
+
+        own = client.own_player
+        if own:
+            shooter.camera.follow(own[0], own[1])
+        background.load_around_camera()
+
+        shooter.update_stars(stars)
+        shooter.draw_background(background, None, stars, effects)
+        draw_entities(client.entities)
+
+        draw_text(f"Score: {client.score}", 36, 100, 40)
+        if client.power_up_type:
+            draw_text(client.power_up_type.capitalize(), 24, WIDTH - 150, 40, WHITE)
+        if not own and client.latest:
+            draw_text("Respawning...", 48, WIDTH // 2, HEIGHT // 3, (255, 0, 128))
+
+        if own:
+            effects.observe(own[4], client.power_up_time)
+        effects.apply(shooter.screen)
+
+        pygame.display.flip()
+        shooter.clock.tick(FPS)
+
+    client.leave()
+    pygame.quit()
+
+def parse_address(text):
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mind-Blowing Shooter local multiplayer")
+    sub = parser.add_subparsers(dest='mode', required=True)
+    server_parser = sub.add_parser('server', help="run the authoritative server")
+    server_parser.add_argument('--host', default='0.0.0.0')
+    server_parser.add_argument('--port', type=int, default=7777)
+    server_parser.add_argument('--world', type=shooter.parse_size, default=(4000, 3000), metavar='WxH')
+    client_parser = sub.add_parser('client', help="join a server")
+    client_parser.add_argument('--connect', type=parse_address, default=('127.0.0.1', 7777), metavar='HOST:PORT')
+    for p in (server_parser, client_parser):
+        p.add_argument('--latency', type=float, default=0, help="simulated one-way latency (ms)")
+        p.add_argument('--jitter', type=float, default=0, help="simulated latency jitter (ms)")
+        p.add_argument('--loss', type=float, default=0, help="simulated packet loss (0..1)")
+    args = parser.parse_args()
+
+    if args.mode == 'server':
+        server = ArenaServer(args.host, args.port, args.world, args.latency / 1000, args.jitter / 1000, args.loss)
+        print(f"server listening on {args.host}:{args.port}")
+        try:
+            server.run()
+        except KeyboardInterrupt:
+            pass
+    else:
+        run_client(args.connect, args.latency / 1000, args.jitter / 1000, args.loss)
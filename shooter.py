@@ -1,11 +1,22 @@
 # mind_blinding_shooter_sketchy.py
 # Modified to give a hand-drawn / sketchy look so it doesn't feel "AI-generated"
 import pygame
+import argparse
 import math
 import random
 import os
+import multiprocessing
+import struct
+import bisect
+from collections import deque
+from itertools import repeat
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
 from pygame import mixer
 import time
+import event_log
 
 # Initialize pygame
 pygame.init()
@@ -14,9 +25,13 @@ pygame.init()
 WIDTH = 1200
 HEIGHT = 800
 
-# Create the screen
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Mind-Blowing Shooter (Sketchy Edition)")
+# World dimensions (same as the screen unless a large arena is requested)
+WORLD_WIDTH = WIDTH
+WORLD_HEIGHT = HEIGHT
+
+# The screen is created by init_display(), so headless users of this module
+# (simulation process, multiplayer server) never open a window
+screen = None
 
 # Create directory for assets if it doesn't exist
 if not os.path.exists('assets'):
@@ -31,14 +46,23 @@ BLUE = (0, 120, 255)
 ORANGE = (255, 165, 0)
 PURPLE = (128, 0, 128)
 
-# Sound effects
-mixer.init()
-mixer.music.set_volume(0.7)
+def init_display():
+    global screen
+    # Create the screen
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Mind-Blowing Shooter (Sketchy Edition)")
+
+    # Sound effects
+    mixer.init()
+    mixer.music.set_volume(0.7)
 
 # Game clock
 clock = pygame.time.Clock()
 FPS = 60
 
+# Gameplay event stream (only records once started, see main(event_dir=...))
+events = event_log.EventLog()
+
 # -----------------------
 # Helper: sketchy draw functions (hand-drawn feel)
 # -----------------------
@@ -96,38 +120,197 @@ def sketch_polygon(surface, color, points, strokes=3, seed=0, filled=True):
         else:
             pygame.draw.polygon(surface, color, pts, max(1, strokes - i))
 
-# subtle grain overlay (cheap)
-def draw_grain(surface, intensity=30, density=400):
-    """Draw random tiny translucent dots to create a paper-like grain."""
-    for _ in range(int(density * (intensity/50.0))):
-        x = random.randint(0, WIDTH)
-        y = random.randint(0, HEIGHT)
-        a = random.randint(8, 40)
-        surface.set_at((x, y), (a, a, a, a))
+# -----------------------
+# Post-processing effects (grain, flashes, tint, shake, vignette)
+# -----------------------
+class PostEffects:
+    """
+    Full-screen effects on a fixed per-frame budget. Per-pixel work (noise tiles,
+    vignette) is done once up front with NumPy through pygame.surfarray; each frame
+    only does a handful of blended blits, which pygame runs in C. (Blended blits are
+    about ten times faster than blended fills, so tint and flash go through blits too.)
+    If ordinary frames (flashes are short, so they don't count) average more than
+    budget_ms, the vignette and then the grain are switched off; each comes back
+    once the average leaves clear room for its own measured cost.
+    """
+    GRAIN_TILE = 256  # Noise tiles are this many pixels square
+    GRAIN_FRAMES = 8  # Tiles cycled through for animated grain
+
+    def __init__(self, budget_ms=2.5, grain_density=0.003, vignette_strength=0.35):
+        noise = np.random.default_rng()
+        self.grain_tiles = [self._make_grain_tile(noise, grain_density) for _ in range(self.GRAIN_FRAMES)]
+        self.vignette = self._make_vignette(vignette_strength)
+        self.tinted_vignette = self.vignette
+        self.layer = pygame.Surface((WIDTH, HEIGHT))  # Solid-color layer for flashes
+        self.use_grain = True
+        self.use_vignette = self.has_vignette = vignette_strength > 0
+        self.budget = budget_ms / 1000
+        self.cost = 0.0  # Moving average of seconds spent per ordinary frame
+        self.grain_cost = 0.0  # Moving averages of the optional layers while they are on
+        self.vignette_cost = 0.0
+        self.frame_cost = 0.0
+        self.grain_time = 0.0
+        self.settle = 30  # Frames until the budget is judged (again)
+        self.frame = 0
+        self.rng = random.Random()  # Keep effects out of the game's random state
+        self.grain_offset = (0, 0)  # Chosen once per frame, so a redrawn frame gets the same grain
+        self.grain_drawn = False
+
+        self.tint = None
+        self.tinted = None  # Tint the current tinted_vignette was built for
+        self.flash_color = (0, 0, 0)
+        self.flash_time = 0
+        self.flash_length = 1
+        self.shake_strength = 0
+        self.shake_time = 0
+        self.shake_length = 1
+        self.last_health = None
+        self.last_power_up_time = 0
+
+    def _make_grain_tile(self, noise, density):
+        size = self.GRAIN_TILE
+        values = noise.integers(8, 25, (size, size), dtype=np.uint8)
+        values[noise.random((size, size)) >= density] = 0
+        tile = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.surfarray.pixels3d(tile)[:] = values[:, :, None]
+        pygame.surfarray.pixels_alpha(tile)[:] = values
+        return tile
+
+    def _make_vignette(self, strength):
+        # Multiply layer: white in the middle, darker towards the corners (surfarray is [x, y])
+        x = np.linspace(-1, 1, WIDTH, dtype=np.float32)[:, None]
+        y = np.linspace(-1, 1, HEIGHT, dtype=np.float32)[None, :]
+        falloff = np.clip((x * x + y * y) / 2, 0, 1) ** 1.5
+        shade = (255 * (1 - strength * falloff)).astype(np.uint8)
+        vignette = pygame.Surface((WIDTH, HEIGHT))
+        pygame.surfarray.pixels3d(vignette)[:] = shade[:, :, None]
+        return vignette
+
+    def flash(self, color, frames=12):
+        self.flash_color = color
+        self.flash_time = self.flash_length = frames
+
+    def shake(self, strength=8, frames=15):
+        self.shake_strength = strength
+        self.shake_time = self.shake_length = frames
+
+    def observe(self, health, power_up_time, game_over=False):
+        """Trigger effects from what the frame shows (works for local games and snapshots)."""
+        if self.last_health is not None and health < self.last_health:
+            self.flash((120, 0, 0))
+            self.shake()
+        if power_up_time > self.last_power_up_time + 1:
+            self.flash((60, 60, 60), frames=20)  # New power-up picked up
+        self.last_health = health
+        self.last_power_up_time = power_up_time
+        self.tint = (255, 140, 140) if game_over else None
+
+    def _multiply_layer(self):
+        """Vignette with the current tint folded in, so both cost one blit."""
+        if self.tint != self.tinted:
+            self.tinted = self.tint
+            self.tinted_vignette = self.vignette
+            if self.tint:
+                self.tinted_vignette = self.vignette.copy()
+                self.tinted_vignette.fill(self.tint, special_flags=pygame.BLEND_RGB_MULT)
+        return self.tinted_vignette
+
+    def apply_grain(self, surface):
+        """Animated paper grain: this frame's noise tile, tiled from this frame's offset."""
+        if not self.use_grain:
+            return
+        start = time.perf_counter()
+        tile = self.grain_tiles[self.frame % self.GRAIN_FRAMES]
+        size = self.GRAIN_TILE
+        ox, oy = self.grain_offset
+        for x in range(-ox, WIDTH, size):
+            for y in range(-oy, HEIGHT, size):
+                surface.blit(tile, (x, y), special_flags=pygame.BLEND_RGBA_SUB)
+        if not self.grain_drawn:  # Redrawing the same frame is not charged to the budget twice
+            self.grain_time = time.perf_counter() - start
+            self.frame_cost += self.grain_time
+            self.grain_drawn = True
+
+    def apply(self, surface):
+        """Full-frame effects; call once per frame after everything is drawn."""
+        start = time.perf_counter()
+        flashing = self.flash_time > 0
+        if flashing:
+            fade = self.flash_time / self.flash_length
+            self.layer.fill(tuple(int(c * fade) for c in self.flash_color))
+            surface.blit(self.layer, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+            self.flash_time -= 1
+        vignette_start = time.perf_counter()
+        if self.use_vignette or self.tint:
+            if self.use_vignette:
+                layer = self._multiply_layer()
+            else:
+                self.layer.fill(self.tint)
+                layer = self.layer
+            surface.blit(layer, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+        vignette_time = time.perf_counter() - vignette_start
+
+        # Shake the world (not the HUD) by offsetting the camera for the next frame
+        camera.shake = (0, 0)
+        if self.shake_time > 0:
+            amount = self.shake_strength * self.shake_time / self.shake_length
+            camera.shake = (int(self.rng.uniform(-amount, amount)), int(self.rng.uniform(-amount, amount)))
+            self.shake_time -= 1
+
+        self.frame_cost += time.perf_counter() - start
+        if not flashing:
+            self.cost = self.cost * 0.9 + self.frame_cost * 0.1
+            if self.use_grain:
+                self.grain_cost = self.grain_cost * 0.9 + self.grain_time * 0.1
+            if self.use_vignette:
+                self.vignette_cost = self.vignette_cost * 0.9 + vignette_time * 0.1
+            self.settle -= 1
+            if self.settle <= 0:
+                self._fit_budget()
+        self.frame_cost = 0.0
+        self.frame += 1
+        self.grain_offset = (self.rng.randrange(self.GRAIN_TILE), self.rng.randrange(self.GRAIN_TILE))
+        self.grain_drawn = False
+
+    def _fit_budget(self):
+        """Drop optional layers while over budget, most expensive first; bring them back with headroom."""
+        headroom = self.budget * 0.75 - self.cost
+        if self.cost > self.budget and self.use_vignette:
+            self.use_vignette = False
+        elif self.cost > self.budget and self.use_grain:
+            self.use_grain = False
+        elif not self.use_grain and self.grain_cost < headroom:
+            self.use_grain = True
+        elif not self.use_vignette and self.has_vignette and self.vignette_cost < headroom:
+            self.use_vignette = True
+        else:
+            return
+        self.settle = 60  # Let the average catch up before judging again
 
 # -----------------------
 # Power-up class
 # -----------------------
+POWER_UP_TYPES = ['health', 'speed', 'rapidfire', 'damage']
+
 class PowerUp:
-    def __init__(self, x=None, y=None):
+    def __init__(self, x=None, y=None, rng=random):
         # If no position specified, spawn at random location
         if x is None:
-            self.x = random.randint(100, WIDTH - 100)
+            self.x = camera.x + rng.randint(100, WIDTH - 100)
         else:
             self.x = x
 
         if y is None:
-            self.y = random.randint(100, HEIGHT - 100)
+            self.y = camera.y + rng.randint(100, HEIGHT - 100)
         else:
             self.y = y
 
         self.size = 30
-        self.type = random.choice(['health', 'speed', 'rapidfire', 'damage'])
+        self.type = rng.choice(POWER_UP_TYPES)
         self.lifetime = 600  # 10 seconds at 60 FPS
-        self.pulse_size = self.size
         self.pulse_dir = 1
-        self.angle = random.uniform(0, 2*math.pi)  # For rotation effect
-        self.seed = random.random() * 1000
+        self.angle = rng.uniform(0, 2*math.pi)  # For rotation effect
+        self.seed = rng.random() * 1000
 
         # Set color based on type
         if self.type == 'health':
@@ -139,33 +322,36 @@ class PowerUp:
         elif self.type == 'damage':
             self.color = (255, 90, 90)  # red
 
-    def update(self):
-        # Pulsing effect (use sin-based jitter so it's smooth)
-        self.pulse_size = self.size + math.sin(time.time()*3 + self.seed) * 4
+    def update(self, steps=1):
         # Rotation effect
         self.angle += 0.04
         if self.angle > 2 * math.pi:
             self.angle = 0
 
-        # Reduce lifetime
-        self.lifetime -= 1
+        # Reduce lifetime (coarse updates advance several frames at once)
+        self.lifetime -= steps
         return self.lifetime <= 0
 
     def draw(self):
+        if not camera.is_visible(self.x, self.y, self.size * 2):
+            return
+        x, y = camera.to_screen(self.x, self.y)
+        # Pulsing effect (use sin-based jitter so it's smooth; wall-clock based, so not game state)
+        pulse_size = self.size + math.sin(time.time()*3 + self.seed) * 4
         # Glow: slightly hand-sketched circular glow
         glow_surf = pygame.Surface((self.size * 4, self.size * 4), pygame.SRCALPHA)
-        sketch_circle(glow_surf, self.color, (self.size*2, self.size*2), int(self.pulse_size*1.5), strokes=3, seed=self.seed, filled=True)
+        sketch_circle(glow_surf, self.color, (self.size*2, self.size*2), int(pulse_size*1.5), strokes=3, seed=self.seed, filled=True)
         glow_surf.set_alpha(80)
-        screen.blit(glow_surf, (self.x - self.size * 2, self.y - self.size * 2))
+        screen.blit(glow_surf, (x - self.size * 2, y - self.size * 2))
 
         # Draw main power-up shape (different shapes for different types) with sketchy rendering
         if self.type == 'health':
             # cross: made from two rectangles approximated as polygons
             w = self.size // 2
-            points_h = [(self.x - w//2, self.y - self.size//2), (self.x + w//2, self.y - self.size//2),
-                        (self.x + w//2, self.y + self.size//2), (self.x - w//2, self.y + self.size//2)]
-            points_v = [(self.x - self.size//2, self.y - w//2), (self.x + self.size//2, self.y - w//2),
-                        (self.x + self.size//2, self.y + w//2), (self.x - self.size//2, self.y + w//2)]
+            points_h = [(x - w//2, y - self.size//2), (x + w//2, y - self.size//2),
+                        (x + w//2, y + self.size//2), (x - w//2, y + self.size//2)]
+            points_v = [(x - self.size//2, y - w//2), (x + self.size//2, y - w//2),
+                        (x + self.size//2, y + w//2), (x - self.size//2, y + w//2)]
             sketch_polygon(screen, self.color, points_h, strokes=3, seed=self.seed)
             sketch_polygon(screen, self.color, points_v, strokes=3, seed=self.seed+5)
         elif self.type == 'speed':
@@ -173,25 +359,26 @@ class PowerUp:
             pts = []
             for k in range(3):
                 ang = self.angle + k * (2 * math.pi / 3)
-                pts.append((self.x + math.cos(ang) * self.size, self.y + math.sin(ang) * self.size))
+                pts.append((x + math.cos(ang) * self.size, y + math.sin(ang) * self.size))
             sketch_polygon(screen, self.color, pts, strokes=3, seed=self.seed)
         elif self.type == 'rapidfire':
             # star-like shape
             star_pts = []
             for i in range(5):
                 angle = self.angle + i * (2 * math.pi / 5)
-                outer = (self.x + math.cos(angle) * self.size, self.y + math.sin(angle) * self.size)
+                outer = (x + math.cos(angle) * self.size, y + math.sin(angle) * self.size)
                 inner_angle = angle + math.pi / 5
-                inner = (self.x + math.cos(inner_angle) * (self.size // 2), self.y + math.sin(inner_angle) * (self.size // 2))
+                inner = (x + math.cos(inner_angle) * (self.size // 2), y + math.sin(inner_angle) * (self.size // 2))
                 star_pts.append(outer)
                 star_pts.append(inner)
             sketch_polygon(screen, self.color, star_pts, strokes=3, seed=self.seed)
         elif self.type == 'damage':
             # diamond
-            pts = [(self.x, self.y - self.size), (self.x + self.size, self.y), (self.x, self.y + self.size), (self.x - self.size, self.y)]
+            pts = [(x, y - self.size), (x + self.size, y), (x, y + self.size), (x - self.size, y)]
             sketch_polygon(screen, self.color, pts, strokes=3, seed=self.seed)
 
     def apply(self, player):
+        events.emit(event_log.PICKUP, self.x, self.y, 0, POWER_UP_TYPES.index(self.type))
         if self.type == 'health':
             player.health = min(player.max_health, player.health + 50)
             return "Health restored!"
@@ -209,9 +396,9 @@ class PowerUp:
 # Player class
 # -----------------------
 class Player:
-    def __init__(self):
-        self.x = WIDTH // 2
-        self.y = HEIGHT // 2
+    def __init__(self, rng=random):
+        self.x = WORLD_WIDTH // 2
+        self.y = WORLD_HEIGHT // 2
         self.speed = 5
         self.angle = 0
         self.size = 50
@@ -223,9 +410,9 @@ class Player:
         self.power_up_time = 0  # Time left for current power-up
         self.power_up_type = None  # Current active power-up
         self.bullet_damage = 25  # Default bullet damage
-        self.seed = random.random() * 1000
+        self.seed = rng.random() * 1000
 
-    def update(self, keys):
+    def update(self, keys, aim=None):
         # Movement
         if keys[pygame.K_w] or keys[pygame.K_UP]:
             self.y -= self.speed
@@ -236,12 +423,12 @@ class Player:
         if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
             self.x += self.speed
 
-        # Keep player on screen
-        self.x = max(self.size // 2, min(WIDTH - self.size // 2, self.x))
-        self.y = max(self.size // 2, min(HEIGHT - self.size // 2, self.y))
+        # Keep player inside the world
+        self.x = max(self.size // 2, min(WORLD_WIDTH - self.size // 2, self.x))
+        self.y = max(self.size // 2, min(WORLD_HEIGHT - self.size // 2, self.y))
 
-        # Calculate angle to mouse
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+        # Calculate angle to mouse (aim is the mouse in world coordinates, if already known)
+        mouse_x, mouse_y = aim if aim is not None else camera.to_world(*pygame.mouse.get_pos())
         self.angle = math.atan2(mouse_y - self.y, mouse_x - self.x)
 
         # Gun cooldown
@@ -260,11 +447,12 @@ class Player:
                 self.power_up_type = None
 
     def draw(self):
+        x, y = camera.to_screen(self.x, self.y)
         # Add small wobble to center so it doesn't look perfectly static
         ox, oy = jitter(self.seed, magnitude=0.8, freq=0.6)
 
         # Draw player body (sketchy circle)
-        sketch_circle(screen, BLUE, (int(self.x + ox), int(self.y + oy)), int(self.size // 2), strokes=4, seed=self.seed, filled=True)
+        sketch_circle(screen, BLUE, (int(x + ox), int(y + oy)), int(self.size // 2), strokes=4, seed=self.seed, filled=True)
 
         # Draw eyes (with small asymmetric offsets)
         eye_offset = self.size // 6
@@ -273,14 +461,14 @@ class Player:
         eye_dir_y = math.sin(self.angle) * (eye_offset//2)
 
         # Left eye (sketch)
-        lx = int(self.x - eye_offset + eye_dir_x + ox)
-        ly = int(self.y - eye_offset + eye_dir_y + oy)
+        lx = int(x - eye_offset + eye_dir_x + ox)
+        ly = int(y - eye_offset + eye_dir_y + oy)
         sketch_circle(screen, WHITE, (lx, ly), int(eye_size), strokes=3, seed=self.seed+10)
         sketch_circle(screen, BLACK, (lx+int(eye_dir_x*0.6), ly+int(eye_dir_y*0.6)), int(eye_size//2), strokes=2, seed=self.seed+11)
 
         # Right eye (sketch)
-        rx = int(self.x + eye_offset + eye_dir_x + ox)
-        ry = int(self.y - eye_offset + eye_dir_y + oy)
+        rx = int(x + eye_offset + eye_dir_x + ox)
+        ry = int(y - eye_offset + eye_dir_y + oy)
         sketch_circle(screen, WHITE, (rx, ry), int(eye_size), strokes=3, seed=self.seed+20)
         sketch_circle(screen, BLACK, (rx+int(eye_dir_x*0.6), ry+int(eye_dir_y*0.6)), int(eye_size//2), strokes=2, seed=self.seed+21)
 
@@ -289,8 +477,8 @@ class Player:
         health_percent = self.health / self.max_health
         if health_percent > 0.7:
             # happy arc -> approximate with multiple short lines
-            start = (self.x - mouth_size, self.y + mouth_size//2 + oy)
-            end = (self.x + mouth_size, self.y + mouth_size//2 + oy)
+            start = (x - mouth_size, y + mouth_size//2 + oy)
+            end = (x + mouth_size, y + mouth_size//2 + oy)
             for i in range(5):
                 # slightly curved by offsetting middle
                 mx = start[0] + (end[0]-start[0]) * (i/4)
@@ -298,11 +486,11 @@ class Player:
                 sketch_line(screen, BLACK, (mx-6, my), (mx+6, my+1), width=2, strokes=2, seed=self.seed+i*3)
         elif health_percent > 0.3:
             # neutral line
-            sketch_line(screen, BLACK, (self.x - mouth_size, self.y + mouth_size//2 + oy), (self.x + mouth_size, self.y + mouth_size//2 + oy), width=3, strokes=3, seed=self.seed+50)
+            sketch_line(screen, BLACK, (x - mouth_size, y + mouth_size//2 + oy), (x + mouth_size, y + mouth_size//2 + oy), width=3, strokes=3, seed=self.seed+50)
         else:
             # sad arc (inverse)
-            start = (self.x - mouth_size, self.y + mouth_size + oy)
-            end = (self.x + mouth_size, self.y + mouth_size + oy)
+            start = (x - mouth_size, y + mouth_size + oy)
+            end = (x + mouth_size, y + mouth_size + oy)
             for i in range(5):
                 mx = start[0] + (end[0]-start[0]) * (i/4)
                 my = start[1] + abs(math.sin((i/4)*math.pi)) * mouth_size * 0.4
@@ -310,9 +498,9 @@ class Player:
 
         # Draw gun (sketchy lines)
         gun_length = self.size * 1.2
-        end_x = self.x + math.cos(self.angle) * gun_length
-        end_y = self.y + math.sin(self.angle) * self.size
-        sketch_line(screen, BLACK, (self.x + ox, self.y + oy), (end_x, end_y), width=6, strokes=4, seed=self.seed+100)
+        end_x = x + math.cos(self.angle) * gun_length
+        end_y = y + math.sin(self.angle) * self.size
+        sketch_line(screen, BLACK, (x + ox, y + oy), (end_x, end_y), width=6, strokes=4, seed=self.seed+100)
 
         # barrel extension
         barrel_end_x = end_x + math.cos(self.angle) * (self.size // 2)
@@ -322,8 +510,8 @@ class Player:
         # handle - draw a short thick line with jitter
         handle_angle = self.angle + math.pi/2
         handle_length = self.size // 3
-        handle_x = self.x + math.cos(self.angle) * (self.size // 2)
-        handle_y = self.y + math.sin(self.angle) * (self.size // 2)
+        handle_x = x + math.cos(self.angle) * (self.size // 2)
+        handle_y = y + math.sin(self.angle) * (self.size // 2)
         handle_end_x = handle_x + math.cos(handle_angle) * handle_length
         handle_end_y = handle_y + math.sin(handle_angle) * handle_length
         sketch_line(screen, (139, 69, 19), (handle_x, handle_y), (handle_end_x, handle_end_y), width=6, strokes=3, seed=self.seed+111)
@@ -331,13 +519,13 @@ class Player:
         # Health bar (sketchy rectangles using lines)
         health_width = int((self.health / self.max_health) * 100)
         # background box (drawn with sketch_line as border)
-        sketch_line(screen, RED, (self.x - 50, self.y - 60), (self.x + 50, self.y - 60), width=8, strokes=3, seed=self.seed+200)
-        sketch_line(screen, GREEN, (self.x - 50, self.y - 60), (self.x - 50 + health_width, self.y - 60), width=6, strokes=3, seed=self.seed+201)
+        sketch_line(screen, RED, (x - 50, y - 60), (x + 50, y - 60), width=8, strokes=3, seed=self.seed+200)
+        sketch_line(screen, GREEN, (x - 50, y - 60), (x - 50 + health_width, y - 60), width=6, strokes=3, seed=self.seed+201)
 
-    def shoot(self, bullets, particles):
+    def shoot(self, bullets, particles, rng=random):
         if self.gun_cooldown == 0:
             # Create bullet with current damage (possibly increased by power-up)
-            bullet = Bullet(self.x, self.y, self.angle, self.bullet_damage)
+            bullet = Bullet(self.x, self.y, self.angle, self.bullet_damage, rng)
             bullets.append(bullet)
             self.gun_cooldown = self.gun_cooldown_max
 
@@ -345,13 +533,13 @@ class Player:
             flash_x = self.x + math.cos(self.angle) * self.size * 1.5
             flash_y = self.y + math.sin(self.angle) * self.size * 1.5
             for _ in range(10):
-                flash_angle = self.angle + random.uniform(-0.5, 0.5)
-                flash_speed = random.uniform(2, 6)
-                flash_color = (255, random.randint(100, 255), 0)  # Orange-yellow
-                flash = Particle(flash_x, flash_y, flash_color)
+                flash_angle = self.angle + rng.uniform(-0.5, 0.5)
+                flash_speed = rng.uniform(2, 6)
+                flash_color = (255, rng.randint(100, 255), 0)  # Orange-yellow
+                flash = Particle(flash_x, flash_y, flash_color, rng)
                 flash.angle = flash_angle
                 flash.speed = flash_speed
-                flash.lifetime = random.randint(5, 10)  # Short lifetime
+                flash.lifetime = rng.randint(5, 10)  # Short lifetime
                 particles.append(flash)
 
             # Gun sound effect placeholder
@@ -359,6 +547,7 @@ class Player:
 
     def take_damage(self, amount):
         self.health -= amount
+        events.emit(event_log.DAMAGE, self.x, self.y, amount, max(0, self.health))
         if self.health <= 0:
             self.health = 0
             return True  # Player is dead
@@ -368,79 +557,91 @@ class Player:
 # Bullet class
 # -----------------------
 class Bullet:
-    def __init__(self, x, y, angle, damage=25):
+    def __init__(self, x, y, angle, damage=25, rng=random):
         self.x = x + math.cos(angle) * 50  # Start bullet from gun position
         self.y = y + math.sin(angle) * 50
+        self.prev_x = self.x  # Position at the start of the frame (for swept collision)
+        self.prev_y = self.y
         self.angle = angle
         self.speed = 15
         self.size = 8
         self.damage = damage  # Now takes damage parameter
         self.lifetime = 60  # Frames before bullet disappears
-        self.seed = random.random() * 1000
+        self.seed = rng.random() * 1000
 
     def update(self):
         # Move bullet
+        self.prev_x, self.prev_y = self.x, self.y
         self.x += math.cos(self.angle) * self.speed
         self.y += math.sin(self.angle) * self.speed
         self.lifetime -= 1
 
-        # Check if bullet is off screen or expired
-        if (self.x < 0 or self.x > WIDTH or
-            self.y < 0 or self.y > HEIGHT or
+        # Check if bullet has left the world or expired
+        if (self.x < 0 or self.x > WORLD_WIDTH or
+            self.y < 0 or self.y > WORLD_HEIGHT or
             self.lifetime <= 0):
             return True  # Bullet should be removed
         return False
 
     def draw(self):
+        if not camera.is_visible(self.x, self.y, self.size + 3):
+            return
+        x, y = camera.to_screen(self.x, self.y)
         # Make bullet look sketchy and glowing
-        sketch_circle(screen, ORANGE, (int(self.x), int(self.y)), self.size, strokes=3, seed=self.seed, filled=True)
-        sketch_circle(screen, (255, 255, 200), (int(self.x), int(self.y)), self.size+3, strokes=2, seed=self.seed+3, filled=False)
+        sketch_circle(screen, ORANGE, (int(x), int(y)), self.size, strokes=3, seed=self.seed, filled=True)
+        sketch_circle(screen, (255, 255, 200), (int(x), int(y)), self.size+3, strokes=2, seed=self.seed+3, filled=False)
 
 # -----------------------
 # Enemy class
 # -----------------------
 class Enemy:
-    def __init__(self):
-        # Spawn enemies from edges
-        side = random.randint(0, 3)
+    def __init__(self, rng=random):
+        # Spawn enemies from edges of the view
+        side = rng.randint(0, 3)
         if side == 0:  # Top
-            self.x = random.randint(0, WIDTH)
-            self.y = -50
+            self.x = camera.x + rng.randint(0, WIDTH)
+            self.y = camera.y - 50
         elif side == 1:  # Right
-            self.x = WIDTH + 50
-            self.y = random.randint(0, HEIGHT)
+            self.x = camera.x + WIDTH + 50
+            self.y = camera.y + rng.randint(0, HEIGHT)
         elif side == 2:  # Bottom
-            self.x = random.randint(0, WIDTH)
-            self.y = HEIGHT + 50
+            self.x = camera.x + rng.randint(0, WIDTH)
+            self.y = camera.y + HEIGHT + 50
         else:  # Left
-            self.x = -50
-            self.y = random.randint(0, HEIGHT)
+            self.x = camera.x - 50
+            self.y = camera.y + rng.randint(0, HEIGHT)
 
-        self.speed = random.uniform(1.0, 3.0)
-        self.size = random.randint(30, 70)
+        self.speed = rng.uniform(1.0, 3.0)
+        self.size = rng.randint(30, 70)
         self.health = self.size
-        self.color = (random.randint(80, 220), random.randint(20, 120), random.randint(20, 120))
-        self.seed = random.random() * 1000
-
-    def update(self, player_x, player_y):
-        # Move towards player
+        self.color = (rng.randint(80, 220), rng.randint(20, 120), rng.randint(20, 120))
+        self.seed = rng.random() * 1000
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def update(self, player_x, player_y, steps=1):
+        # Move towards player (coarse updates advance several frames at once)
+        self.prev_x, self.prev_y = self.x, self.y
         angle = math.atan2(player_y - self.y, player_x - self.x)
-        self.x += math.cos(angle) * self.speed
-        self.y += math.sin(angle) * self.speed
+        self.x += math.cos(angle) * self.speed * steps
+        self.y += math.sin(angle) * self.speed * steps
 
     def draw(self):
+        if not camera.is_visible(self.x, self.y, self.size):
+            return
+        x, y = camera.to_screen(self.x, self.y)
         # Slight wobble so circles are not perfect
-        sketch_circle(screen, self.color, (int(self.x), int(self.y)), int(self.size), strokes=4, seed=self.seed, filled=True)
+        sketch_circle(screen, self.color, (int(x), int(y)), int(self.size), strokes=4, seed=self.seed, filled=True)
 
         # Draw eyes (sketchy)
         eye_distance = self.size // 3
         eye_size = max(3, self.size // 6)
-        sketch_circle(screen, WHITE, (int(self.x - eye_distance), int(self.y - eye_distance/2)), eye_size, strokes=2, seed=self.seed+10)
-        sketch_circle(screen, WHITE, (int(self.x + eye_distance), int(self.y - eye_distance/2)), eye_size, strokes=2, seed=self.seed+20)
+        sketch_circle(screen, WHITE, (int(x - eye_distance), int(y - eye_distance/2)), eye_size, strokes=2, seed=self.seed+10)
+        sketch_circle(screen, WHITE, (int(x + eye_distance), int(y - eye_distance/2)), eye_size, strokes=2, seed=self.seed+20)
 
         # Angry mouth arc - sketch approximation
-        mouth_control_x = int(self.x)
-        mouth_control_y = int(self.y + self.size / 2)
+        mouth_control_x = int(x)
+        mouth_control_y = int(y + self.size / 2)
         sketch_line(screen, WHITE, (mouth_control_x - eye_distance, mouth_control_y), (mouth_control_x + eye_distance, mouth_control_y), width=3, strokes=3, seed=self.seed+30)
 
     def take_damage(self, amount):
@@ -451,19 +652,68 @@ class Enemy:
         self.size = max(20, int(self.health))
         return False
 
+# -----------------------
+# Swept collision (bullets vs enemies)
+# -----------------------
+def swept_circle_hits(start, end, centers_start, centers_end, radii):
+    """
+    Every hit of each moving point against a set of moving circles.
+    start, end: (N, 2) point positions at the start / end of the frame
+    centers_start, centers_end: (M, 2) circle centers at the start / end of the frame
+    radii: (N, M) or (M,) contact distances
+    Works in each circle's frame of reference, so the test is an exact
+    segment-vs-circle intersection no matter how far things move in a frame.
+    Returns (point_idx, circle_idx, t) for every point/circle pair that touches,
+    t in [0, 1] being the first contact along the point's path.
+    """
+    # relative segment: s + t*d, for every point/circle pair -> (N, M, 2)
+    s = start[:, None, :] - centers_start[None, :, :]
+    d = (end[:, None, :] - centers_end[None, :, :]) - s
+    a = np.einsum('nmk,nmk->nm', d, d)
+    b = np.einsum('nmk,nmk->nm', s, d)
+    c = np.einsum('nmk,nmk->nm', s, s) - np.broadcast_to(radii, a.shape) ** 2
+
+    # solve |s + t*d|^2 = r^2 for the first root (b is the half coefficient)
+    disc = b * b - a * c
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(a > 0, (-b - np.sqrt(np.maximum(disc, 0))) / a, np.inf)
+    t = np.where(c < 0, 0.0, t)  # already overlapping at the start of the frame
+    hit = (c < 0) | ((disc >= 0) & (t >= 0) & (t <= 1))
+    point_idx, circle_idx = np.nonzero(hit)
+    return point_idx, circle_idx, t[point_idx, circle_idx]
+
+def bullet_enemy_hits(bullets, enemies):
+    """
+    Return every (bullet, enemy) contact this frame, ordered by time of impact.
+    A bullet can appear several times: if its first target is already gone when
+    its turn comes, the next enemy along its path is the one it hits.
+    """
+    if not bullets or not enemies:
+        return []
+    b_start = np.array([(b.prev_x, b.prev_y) for b in bullets], dtype=float)
+    b_end = np.array([(b.x, b.y) for b in bullets], dtype=float)
+    e_start = np.array([(e.prev_x, e.prev_y) for e in enemies], dtype=float)
+    e_end = np.array([(e.x, e.y) for e in enemies], dtype=float)
+    radii = (np.array([e.size for e in enemies], dtype=float)[None, :] +
+             np.array([b.size for b in bullets], dtype=float)[:, None])
+
+    b_idx, e_idx, t = swept_circle_hits(b_start, b_end, e_start, e_end, radii)
+    order = np.argsort(t, kind='stable')
+    return [(bullets[b_idx[i]], enemies[e_idx[i]]) for i in order]
+
 # -----------------------
 # Particle effect for explosions
 # -----------------------
 class Particle:
-    def __init__(self, x, y, color):
+    def __init__(self, x, y, color, rng=random):
         self.x = x
         self.y = y
-        self.size = random.randint(3, 10)
+        self.size = rng.randint(3, 10)
         self.color = color
-        self.lifetime = random.randint(20, 40)
-        self.angle = random.uniform(0, 2 * math.pi)
-        self.speed = random.uniform(2.0, 6.0)
-        self.seed = random.random() * 1000
+        self.lifetime = rng.randint(20, 40)
+        self.angle = rng.uniform(0, 2 * math.pi)
+        self.speed = rng.uniform(2.0, 6.0)
+        self.seed = rng.random() * 1000
 
     def update(self):
         self.x += math.cos(self.angle) * self.speed
@@ -477,7 +727,10 @@ class Particle:
         return False
 
     def draw(self):
-        sketch_circle(screen, self.color, (int(self.x), int(self.y)), max(1, int(self.size)), strokes=2, seed=self.seed, filled=True)
+        if not camera.is_visible(self.x, self.y, self.size):
+            return
+        x, y = camera.to_screen(self.x, self.y)
+        sketch_circle(screen, self.color, (int(x), int(y)), max(1, int(self.size)), strokes=2, seed=self.seed, filled=True)
 
 # -----------------------
 # Background stars
@@ -519,17 +772,21 @@ class Star:
 # Nebula background effect
 # -----------------------
 class Nebula:
-    def __init__(self):
-        self.x = random.randint(0, WIDTH)
-        self.y = random.randint(0, HEIGHT)
-        self.size = random.randint(100, 300)
-        self.color = (random.randint(0, 100),
-                     random.randint(0, 100),
-                     random.randint(100, 255))  # Bluish
-        self.alpha = random.randint(10, 30)
-        self.seed = random.random() * 1000
+    def __init__(self, x=None, y=None, rng=random):
+        # rng lets world chunks regenerate the same nebulas every time they load
+        self.x = rng.randint(0, WIDTH) if x is None else x
+        self.y = rng.randint(0, HEIGHT) if y is None else y
+        self.size = rng.randint(100, 300)
+        self.color = (rng.randint(0, 100),
+                     rng.randint(0, 100),
+                     rng.randint(100, 255))  # Bluish
+        self.alpha = rng.randint(10, 30)
+        self.seed = rng.random() * 1000
 
     def draw(self):
+        if not camera.is_visible(self.x, self.y, self.size // 2):
+            return
+        x, y = camera.to_screen(self.x, self.y)
         # Create a transparent surface for the nebula
         nebula_surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
 
@@ -542,7 +799,168 @@ class Nebula:
                                 self.size // 2 + int(math.cos(time.time()*0.25 + self.seed)*6)),
                                i // 2)
         nebula_surface.set_alpha(self.alpha + 20)
-        screen.blit(nebula_surface, (self.x - self.size // 2, self.y - self.size // 2))
+        screen.blit(nebula_surface, (x - self.size // 2, y - self.size // 2))
+
+# -----------------------
+# Camera (world -> screen)
+# -----------------------
+class Camera:
+    def __init__(self):
+        # Top-left corner of the view in world coordinates
+        self.x = 0
+        self.y = 0
+        self.shake = (0, 0)  # Screen-shake offset, only applied when drawing
+
+    def follow(self, target_x, target_y):
+        # Center on the target but never show anything outside the world
+        self.x = int(max(0, min(WORLD_WIDTH - WIDTH, target_x - WIDTH // 2)))
+        self.y = int(max(0, min(WORLD_HEIGHT - HEIGHT, target_y - HEIGHT // 2)))
+
+    def to_screen(self, x, y):
+        return x - self.x + self.shake[0], y - self.y + self.shake[1]
+
+    def to_world(self, x, y):
+        return x + self.x, y + self.y
+
+    def is_visible(self, x, y, margin=0):
+        return (self.x - margin <= x <= self.x + WIDTH + margin and
+                self.y - margin <= y <= self.y + HEIGHT + margin)
+
+camera = Camera()
+
+# -----------------------
+# Chunked world (large arena mode)
+# -----------------------
+CHUNK_SIZE = 800  # World pixels per chunk side
+LOAD_RADIUS = 3  # Chunks around the camera that stay loaded
+ACTIVE_DISTANCE = 1400  # Entities closer than this to the view center update every frame
+COARSE_INTERVAL = 15  # Frames between updates of far-away entities
+
+class Chunk:
+    def __init__(self, cx, cy, world_seed):
+        self.cx = cx
+        self.cy = cy
+        self.world_seed = world_seed
+        # Entities parked here while they are too far away for full-rate updates
+        self.enemies = []
+        self.power_ups = []
+        self.nebulas = None  # Background, only kept while loaded
+
+    @property
+    def loaded(self):
+        return self.nebulas is not None
+
+    def load(self):
+        # Background is regenerated from the chunk's seed, so unloading it costs nothing
+        rng = random.Random(hash((self.world_seed, self.cx, self.cy)))
+        x0 = self.cx * CHUNK_SIZE
+        y0 = self.cy * CHUNK_SIZE
+        self.nebulas = [Nebula(x0 + rng.randint(0, CHUNK_SIZE), y0 + rng.randint(0, CHUNK_SIZE), rng)
+                        for _ in range(rng.randint(0, 2))]
+
+    def unload(self):
+        self.nebulas = None
+
+    def is_empty(self):
+        return not self.enemies and not self.power_ups
+
+class World:
+    """
+    Large arena split into chunks around a camera that follows the player.
+    Entities near the view live in the regular enemies / power_ups lists and are
+    simulated every frame. Farther ones are parked in their chunk: updated every
+    COARSE_INTERVAL frames while the chunk is loaded, frozen once it unloads.
+    """
+    def __init__(self, seed=None, rng=random):
+        self.seed = rng.getrandbits(32) if seed is None else seed
+        self.chunks = {}  # (cx, cy) -> Chunk
+        self.loaded = set()
+        self.frame = 0
+
+    def chunk_at(self, x, y):
+        key = (int(x // CHUNK_SIZE), int(y // CHUNK_SIZE))
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = Chunk(key[0], key[1], self.seed)
+        return chunk
+
+    def follow(self, player):
+        """Move the camera and load / unload chunks around it."""
+        camera.follow(player.x, player.y)
+        self.load_around_camera()
+
+    def load_around_camera(self):
+        ccx = int((camera.x + WIDTH // 2) // CHUNK_SIZE)
+        ccy = int((camera.y + HEIGHT // 2) // CHUNK_SIZE)
+        max_cx = (WORLD_WIDTH - 1) // CHUNK_SIZE
+        max_cy = (WORLD_HEIGHT - 1) // CHUNK_SIZE
+        wanted = {(cx, cy)
+                  for cx in range(max(0, ccx - LOAD_RADIUS), min(max_cx, ccx + LOAD_RADIUS) + 1)
+                  for cy in range(max(0, ccy - LOAD_RADIUS), min(max_cy, ccy + LOAD_RADIUS) + 1)}
+
+        for key in self.loaded - wanted:
+            chunk = self.chunks[key]
+            chunk.unload()
+            if chunk.is_empty():
+                del self.chunks[key]  # Nothing left to remember
+        for key in wanted - self.loaded:
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                chunk = self.chunks[key] = Chunk(key[0], key[1], self.seed)
+            chunk.load()
+        self.loaded = wanted
+
+    def _is_active(self, x, y):
+        cx = camera.x + WIDTH // 2
+        cy = camera.y + HEIGHT // 2
+        return abs(x - cx) <= ACTIVE_DISTANCE and abs(y - cy) <= ACTIVE_DISTANCE
+
+    def update(self, player, enemies, power_ups):
+        """Park far entities, coarsely update loaded chunks and wake up nearby ones."""
+        self.frame += 1
+
+        # Park active entities that drifted out of range
+        for enemy in enemies[:]:
+            if not self._is_active(enemy.x, enemy.y):
+                enemies.remove(enemy)
+                self.chunk_at(enemy.x, enemy.y).enemies.append(enemy)
+        for power_up in power_ups[:]:
+            if not self._is_active(power_up.x, power_up.y):
+                power_ups.remove(power_up)
+                self.chunk_at(power_up.x, power_up.y).power_ups.append(power_up)
+
+        for key in self.loaded:
+            chunk = self.chunks[key]
+            if chunk.is_empty():
+                continue
+
+            # Spread coarse updates over frames instead of doing every chunk at once
+            if (chunk.cx + chunk.cy) % COARSE_INTERVAL == self.frame % COARSE_INTERVAL:
+                for enemy in chunk.enemies[:]:
+                    enemy.update(player.x, player.y, steps=COARSE_INTERVAL)
+                    enemy.prev_x, enemy.prev_y = enemy.x, enemy.y
+                    home = self.chunk_at(enemy.x, enemy.y)
+                    if home is not chunk:
+                        chunk.enemies.remove(enemy)
+                        home.enemies.append(enemy)
+                for power_up in chunk.power_ups[:]:
+                    if power_up.update(steps=COARSE_INTERVAL):
+                        chunk.power_ups.remove(power_up)
+
+            # Wake up entities that are close enough for full-rate simulation
+            for enemy in chunk.enemies[:]:
+                if self._is_active(enemy.x, enemy.y):
+                    chunk.enemies.remove(enemy)
+                    enemies.append(enemy)
+            for power_up in chunk.power_ups[:]:
+                if self._is_active(power_up.x, power_up.y):
+                    chunk.power_ups.remove(power_up)
+                    power_ups.append(power_up)
+
+    def draw_background(self):
+        for key in self.loaded:
+            for nebula in self.chunks[key].nebulas:
+                nebula.draw()
 
 # -----------------------
 # Draw text function (keeps same)
@@ -554,6 +972,24 @@ def draw_text(text, font_size, x, y, color=WHITE):
     text_rect = text_surface.get_rect(center=(x, y))
     screen.blit(text_surface, text_rect)
 
+
+# -----------------------
+# Entities rebuilt from stored state (snapshots, shared memory, network)
+# -----------------------
+def bare_objects(cls, columns):
+    """
+    Objects of cls whose attributes come from columns ({name: list of values}),
+    built without __init__ (which spawns at random and uses the game's RNG).
+    """
+    names = list(columns)
+    new = object.__new__
+    objs = []
+    for attrs in map(dict, map(zip, repeat(names), zip(*columns.values()))):
+        obj = new(cls)
+        obj.__dict__ = attrs
+        objs.append(obj)
+    return objs
+
 # -----------------------
 # Game states
 # -----------------------
@@ -562,250 +998,917 @@ PLAYING = 1
 GAME_OVER = 2
 
 # -----------------------
-# Main game function (logic mostly same)
+# Game rules (no drawing, so they can also run in a separate process)
 # -----------------------
-def main():
-    game_state = MENU
+def set_world_size(world_size):
+    global WORLD_WIDTH, WORLD_HEIGHT
+    # Large arena mode: the world is bigger than the screen and split into chunks.
+    # None goes back to the single-screen arena (e.g. loading a normal save after --world)
+    if world_size:
+        WORLD_WIDTH = max(WIDTH, world_size[0])
+        WORLD_HEIGHT = max(HEIGHT, world_size[1])
+    else:
+        WORLD_WIDTH, WORLD_HEIGHT = WIDTH, HEIGHT
+
+class Game:
+    def __init__(self, world_size=None, seed=None):
+        # The rules draw only from this RNG (saved in snapshots); drawing code uses the global one
+        self.rng = random.Random(seed)
+        self.world = World(rng=self.rng) if world_size else None
+        self.state = MENU
+
+        # Create player
+        self.player = Player(self.rng)
+
+        # Game objects
+        self.bullets = []
+        self.enemies = []
+        self.particles = []
+        self.power_ups = []
+
+        # Game variables
+        self.enemy_spawn_timer = 0
+        self.enemy_spawn_delay = 60  # Frames between enemy spawns
+        self.power_up_spawn_timer = 0
+        self.power_up_spawn_interval = 600  # Spawn power-up every 10 seconds
+        self.score = 0
+        self.message_text = ""
+        self.message_time = 0
+        self.tick = 0  # Frames simulated so far (keys snapshots / rewind keyframes)
+
+    def press_space(self):
+        if self.state == MENU:
+            self.state = PLAYING
+        elif self.state == GAME_OVER:
+            # Reset game
+            self.state = PLAYING
+            self.player = Player(self.rng)
+            self.bullets = []
+            self.enemies = []
+            self.particles = []
+            self.power_ups = []
+            self.score = 0
+            if self.world:
+                self.world = World(rng=self.rng)
+
+    def shoot(self):
+        if self.state == PLAYING:
+            self.player.shoot(self.bullets, self.particles, self.rng)
+
+    def update(self, keys, aim=None):
+        """Advance the game by one frame."""
+        player = self.player
+        bullets = self.bullets
+        enemies = self.enemies
+        particles = self.particles
+        power_ups = self.power_ups
+
+        # Move the camera with the player (and load nearby chunks)
+        if self.world:
+            self.world.follow(player)
+        else:
+            camera.follow(player.x, player.y)
+
+        if self.state != PLAYING:
+            return
+        self.tick += 1
+
+        # Update player
+        player.update(keys, aim)
+
+        # Park / wake entities by distance from the camera
+        if self.world:
+            self.world.update(player, enemies, power_ups)
+
+        # Move bullets (ones that left the world or expired still get their last segment tested)
+        expired = [bullet for bullet in bullets if bullet.update()]
+
+        # Spawn enemies
+        self.enemy_spawn_timer += 1
+        if self.enemy_spawn_timer >= self.enemy_spawn_delay:
+            enemy = Enemy(self.rng)
+            enemies.append(enemy)
+            events.emit(event_log.SPAWN, enemy.x, enemy.y, enemy.size, 0)
+            self.enemy_spawn_timer = 0
+            # Decrease spawn delay over time for difficulty increase
+            self.enemy_spawn_delay = max(10, self.enemy_spawn_delay - 0.2)
+
+        # Spawn power-ups
+        self.power_up_spawn_timer += 1
+        if self.power_up_spawn_timer >= self.power_up_spawn_interval:
+            power_up = PowerUp(rng=self.rng)
+            power_ups.append(power_up)
+            events.emit(event_log.SPAWN, power_up.x, power_up.y, power_up.size, 1)
+            self.power_up_spawn_timer = 0
+
+        # Update power-ups
+        for power_up in power_ups[:]:
+            if power_up.update():
+                power_ups.remove(power_up)
+                continue
+
+            # Check collision with player
+            distance = math.hypot(power_up.x - player.x, power_up.y - player.y)
+            if distance < power_up.size + player.size // 2:
+                # Apply power-up
+                self.message_text = power_up.apply(player)
+                self.message_time = 180  # Display message for 3 seconds
+
+                # Set power-up duration
+                player.power_up_time = 600  # 10 seconds
+                player.power_up_type = power_up.type
+
+                # Create collection effect
+                for _ in range(20):
+                    particles.append(Particle(power_up.x, power_up.y, power_up.color, self.rng))
+
+                power_ups.remove(power_up)
+
+        # Update enemies
+        for enemy in enemies[:]:
+            enemy.update(player.x, player.y)
+
+            # Check collision with player
+            distance = math.hypot(enemy.x - player.x, enemy.y - player.y)
+            if distance < enemy.size + player.size // 2:
+                # Player takes damage on collision
+                if player.take_damage(10):
+                    self.state = GAME_OVER
+                    events.emit(event_log.DEATH, player.x, player.y, self.score)
+
+                # Create explosion particles
+                for _ in range(20):
+                    particles.append(Particle(enemy.x, enemy.y, enemy.color, self.rng))
+
+                enemies.remove(enemy)
+
+        # Check bullet collisions (swept along each bullet's path, earliest hit first)
+        for bullet, enemy in bullet_enemy_hits(bullets, enemies):
+            if bullet not in bullets or enemy not in enemies:
+                continue  # Bullet already hit something / enemy already killed this frame
+
+            # Enemy takes damage
+            if enemy.take_damage(bullet.damage):
+                # Enemy killed
+                self.score += int(enemy.size)
+                events.emit(event_log.KILL, enemy.x, enemy.y, int(enemy.size))
+
+                # Create explosion particles
+                for _ in range(30):
+                    particles.append(Particle(enemy.x, enemy.y, enemy.color, self.rng))
+
+                enemies.remove(enemy)
+
+            # Remove bullet
+            bullets.remove(bullet)
+
+        # Drop bullets that left the world or expired without hitting anything
+        for bullet in expired:
+            if bullet in bullets:
+                bullets.remove(bullet)
+
+        # Update particles
+        for particle in particles[:]:
+            if particle.update():
+                particles.remove(particle)
+
+        # Count down the on-screen message
+        if self.message_time > 0:
+            self.message_time -= 1
 
-    # Create player
-    player = Player()
+# -----------------------
+# Drawing (works on a Game or on a shared-memory snapshot of one)
+# -----------------------
+def update_stars(stars):
+    for star in stars:
+        star.update()
+
+def draw_background(world, nebulas, stars, effects):
+    # Fill screen with deep blue background
+    screen.fill((8, 8, 36))
+
+    # Draw nebulas
+    if world:
+        world.draw_background()
+    else:
+        for nebula in nebulas:
+            nebula.draw()
 
-    # Game objects
-    bullets = []
-    enemies = []
-    particles = []
-    power_ups = []
+    # Draw stars (moved by the caller once per frame, see update_stars)
+    for star in stars:
+        star.draw()
+
+    # lightly overlay grain
+    effects.apply_grain(screen)
+
+def draw_game(game):
+    # Game state specific drawing
+    if game.state == MENU:
+        # Draw menu (sketchy text not necessary, keep normal text)
+        draw_text("MIND-BLOWING SHOOTER", 64, WIDTH//2, HEIGHT//3, (255, 0, 128))
+        draw_text("Use WASD or Arrow Keys to move", 32, WIDTH//2, HEIGHT//2)
+        draw_text("Left Mouse Button to shoot", 32, WIDTH//2, HEIGHT//2 + 50)
+        draw_text("Press SPACE to start", 48, WIDTH//2, HEIGHT//2 + 150, (0, 255, 255))
+
+    elif game.state == PLAYING:
+        player = game.player
+        for bullet in game.bullets:
+            bullet.draw()
+        for power_up in game.power_ups:
+            power_up.draw()
+        for enemy in game.enemies:
+            enemy.draw()
+        for particle in game.particles:
+            particle.draw()
+
+        # Draw player
+        player.draw()
+
+        # Draw score
+        draw_text(f"Score: {game.score}", 36, 100, 40)
+
+        # Draw active power-up indicator if one is active
+        if player.power_up_type:
+            if player.power_up_type == 'health':
+                indicator_color = (0, 255, 0)
+                indicator_text = "Health Boost"
+            elif player.power_up_type == 'speed':
+                indicator_color = (0, 255, 255)
+                indicator_text = "Speed Boost"
+            elif player.power_up_type == 'rapidfire':
+                indicator_color = (255, 255, 0)
+                indicator_text = "Rapid Fire"
+            elif player.power_up_type == 'damage':
+                indicator_color = (255, 0, 0)
+                indicator_text = "Damage Boost"
+
+            # Draw power-up name and time bar
+            draw_text(indicator_text, 24, WIDTH - 150, 40, indicator_color)
+            time_left = int((player.power_up_time / 600) * 100)
+            pygame.draw.rect(screen, (100, 100, 100), (WIDTH - 200, 60, 100, 10))
+            pygame.draw.rect(screen, indicator_color, (WIDTH - 200, 60, time_left, 10))
+
+        # Draw message if active
+        if game.message_time > 0:
+            # Make message fade out
+            alpha = min(255, game.message_time * 1.5)
+            draw_text(game.message_text, 36, WIDTH // 2, HEIGHT // 4, (255, 255, 255))
+
+    elif game.state == GAME_OVER:
+        # Draw game over screen
+        draw_text("GAME OVER", 72, WIDTH//2, HEIGHT//3, RED)
+        draw_text(f"Final Score: {game.score}", 48, WIDTH//2, HEIGHT//2)
+        draw_text("Press SPACE to play again", 36, WIDTH//2, HEIGHT//2 + 100)
 
-    # Create stars for background
-    stars = [Star() for _ in range(120)]
+# -----------------------
+# Two-process mode: simulation -> renderer through shared memory
+# -----------------------
+# Movement keys sent from the renderer to the simulation as a bitmask
+MOVE_KEYS = (pygame.K_w, pygame.K_UP, pygame.K_s, pygame.K_DOWN,
+             pygame.K_a, pygame.K_LEFT, pygame.K_d, pygame.K_RIGHT)
+
+# One row per bullet / enemy / particle / power-up
+ENTITY_DTYPE = np.dtype([
+    ('x', 'f4'), ('y', 'f4'), ('size', 'f4'),
+    ('angle', 'f4'), ('seed', 'f4'), ('color', 'u1', (3,)), ('kind', 'u1'),
+], align=True)
+
+# Per-buffer header: everything that is not an entity row
+SNAPSHOT_HEADER_DTYPE = np.dtype([
+    ('seq', 'u8'),  # odd while the simulation is writing this buffer
+    ('tick', 'u8'),  # simulation frame number
+    ('state', 'i4'),
+    ('score', 'i4'),
+    ('counts', 'i4', (4,)),  # bullets, enemies, particles, power-ups
+    ('player_x', 'f4'), ('player_y', 'f4'), ('player_angle', 'f4'), ('player_seed', 'f4'),
+    ('player_size', 'f4'), ('player_health', 'f4'), ('player_max_health', 'f4'),
+    ('power_up_time', 'i4'), ('power_up_type', 'i4'),  # -1 when no power-up is active
+    ('camera', 'i4', (2,)),
+    ('world_seed', 'i8'),  # -1 outside large arena mode
+    ('world_size', 'i4', (2,)),
+    ('message_time', 'i4'),
+    ('message', 'S64'),
+], align=True)
+
+# Shared control block: which buffer is current, plus the renderer's input
+CONTROL_DTYPE = np.dtype([
+    ('latest', 'i8'),  # index of the last completely written buffer, -1 before the first one
+    ('keys', 'u4'),  # MOVE_KEYS bitmask
+    ('aim', 'f4', (2,)),  # mouse position in world coordinates
+    ('clicks', 'u4'),  # counters only ever go up, so no input is lost between ticks
+    ('spaces', 'u4'),
+    ('rewinds', 'u4'),  # BACKSPACE presses
+    ('saves', 'u4'),  # F5 presses
+    ('quit', 'u1'),
+], align=True)
+
+def _aligned(n, to=64):
+    return (n + to - 1) // to * to
+
+class SharedSnapshot:
+    """
+    Double-buffered game snapshot in shared memory, one writer (simulation) and
+    one reader (renderer). The writer always fills the buffer the reader is not
+    pointed at, bumping its seq to odd before and to even after, then publishes
+    it through control['latest']. No locks: the reader notes seq before using a
+    buffer and checks it is unchanged afterwards to detect a torn read.
+    """
+    CAPACITY = (256, 1024, 4096, 64)  # bullets, enemies, particles, power-ups
+
+    def __init__(self, name=None):
+        self.control_size = _aligned(CONTROL_DTYPE.itemsize)
+        self.buffer_size = _aligned(SNAPSHOT_HEADER_DTYPE.itemsize +
+                                    sum(_aligned(n * ENTITY_DTYPE.itemsize) for n in self.CAPACITY))
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner,
+                                              size=self.control_size + 2 * self.buffer_size)
+        buf = self.shm.buf
+
+        self.control = np.ndarray((), CONTROL_DTYPE, buffer=buf)
+        self.headers = []
+        self.entities = []  # per buffer: [bullets, enemies, particles, power_ups]
+        for b in range(2):
+            offset = self.control_size + b * self.buffer_size
+            self.headers.append(np.ndarray((), SNAPSHOT_HEADER_DTYPE, buffer=buf, offset=offset))
+            offset += SNAPSHOT_HEADER_DTYPE.itemsize
+            arrays = []
+            for n in self.CAPACITY:
+                offset = _aligned(offset, 8)
+                arrays.append(np.ndarray((n,), ENTITY_DTYPE, buffer=buf, offset=offset))
+                offset += n * ENTITY_DTYPE.itemsize
+            self.entities.append(arrays)
+
+        if self.owner:
+            self.control['latest'] = -1
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        # numpy views must go before the mapping can be closed
+        self.control = self.headers = self.entities = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # ---- writer side ----
+    def publish(self, game, tick):
+        latest = int(self.control['latest'])
+        b = 1 if latest == 0 else 0
+        header = self.headers[b]
+        header['seq'] += 1  # odd: write in progress
+
+        lists = (game.bullets, game.enemies, game.particles, game.power_ups)
+        for i, (objs, rows) in enumerate(zip(lists, self.entities[b])):
+            n = min(len(objs), len(rows))
+            if n:
+                rows[:n] = [(o.x, o.y, o.size, getattr(o, 'angle', 0),
+                             o.seed, getattr(o, 'color', (0, 0, 0)),
+                             POWER_UP_TYPES.index(o.type) if isinstance(o, PowerUp) else 0)
+                            for o in objs[:n]]
+            header['counts'][i] = n
+
+        player = game.player
+        header['tick'] = tick
+        header['state'] = game.state
+        header['score'] = game.score
+        header['player_x'] = player.x
+        header['player_y'] = player.y
+        header['player_angle'] = player.angle
+        header['player_seed'] = player.seed
+        header['player_size'] = player.size
+        header['player_health'] = player.health
+        header['player_max_health'] = player.max_health
+        header['power_up_time'] = player.power_up_time
+        header['power_up_type'] = POWER_UP_TYPES.index(player.power_up_type) if player.power_up_type else -1
+        header['camera'] = (camera.x, camera.y)
+        header['world_seed'] = game.world.seed if game.world else -1
+        header['world_size'] = (WORLD_WIDTH, WORLD_HEIGHT)
+        header['message_time'] = game.message_time
+        header['message'] = game.message_text.encode('utf-8')[:64]
+
+        header['seq'] += 1  # even: complete
+        self.control['latest'] = b
+
+    # ---- reader side ----
+    def acquire(self):
+        """Return (buffer, seq) of the newest complete snapshot, or None before the first one."""
+        while True:
+            b = int(self.control['latest'])
+            if b < 0:
+                return None
+            seq = int(self.headers[b]['seq'])
+            if seq % 2 == 0:
+                return b, seq
+
+    def is_intact(self, b, seq):
+        """True if buffer b was not rewritten since acquire() returned seq for it."""
+        return int(self.headers[b]['seq']) == seq
+
+    def view(self, b):
+        return SnapshotView(self.headers[b], self.entities[b])
+
+class SnapshotEntities:
+    """Iterate snapshot rows as objects that the regular draw() methods accept.
+
+    Rows are culled against the snapshot's camera with one NumPy mask first (a wider
+    margin than draw() uses), so only on-screen entities are copied out of shared memory.
+    """
+    def __init__(self, rows, cls, view_pos):
+        self.rows = rows
+        self.cls = cls
+        self.view_pos = view_pos
+
+    def __iter__(self):
+        rows = self.rows
+        x, y = self.view_pos
+        margin = rows['size'] * 2
+        rows = rows[(rows['x'] >= x - margin) & (rows['x'] <= x + WIDTH + margin) &
+                    (rows['y'] >= y - margin) & (rows['y'] <= y + HEIGHT + margin)]
+        size = rows['size'] if self.cls is Particle else rows['size'].astype(int)
+        columns = {
+            'x': rows['x'].tolist(), 'y': rows['y'].tolist(), 'size': size.tolist(),
+            'angle': rows['angle'].tolist(), 'seed': rows['seed'].tolist(),
+            'color': list(zip(*rows['color'].T.tolist())),
+        }
+        if self.cls is PowerUp:
+            columns['type'] = [POWER_UP_TYPES[kind] for kind in rows['kind'].tolist()]
+        return iter(bare_objects(self.cls, columns))
+
+class SnapshotView:
+    """Read-only view of one snapshot buffer with the attributes draw_game() expects."""
+    def __init__(self, header, entities):
+        counts = header['counts']
+        self.tick = int(header['tick'])
+        self.state = int(header['state'])
+        self.score = int(header['score'])
+        self.camera = tuple(int(c) for c in header['camera'])
+        self.bullets = SnapshotEntities(entities[0][:counts[0]], Bullet, self.camera)
+        self.enemies = SnapshotEntities(entities[1][:counts[1]], Enemy, self.camera)
+        self.particles = SnapshotEntities(entities[2][:counts[2]], Particle, self.camera)
+        self.power_ups = SnapshotEntities(entities[3][:counts[3]], PowerUp, self.camera)
+        self.world_seed = int(header['world_seed'])
+        self.world_size = tuple(int(c) for c in header['world_size'])
+        self.message_time = int(header['message_time'])
+        self.message_text = header['message'].item().decode('utf-8', 'ignore')
+
+        player = object.__new__(Player)
+        player.x = float(header['player_x'])
+        player.y = float(header['player_y'])
+        player.angle = float(header['player_angle'])
+        player.seed = float(header['player_seed'])
+        player.size = int(header['player_size'])
+        player.health = float(header['player_health'])
+        player.max_health = float(header['player_max_health'])
+        player.power_up_time = int(header['power_up_time'])
+        kind = int(header['power_up_type'])
+        player.power_up_type = POWER_UP_TYPES[kind] if kind >= 0 else None
+        self.player = player
+
+def run_simulation(shm_name, world_size=None, event_dir=None, load_path=None):
+    """Simulation process: runs the game rules at FPS and publishes snapshots."""
+    set_world_size(world_size)
+    if event_dir:
+        events.start(event_dir)
+    snapshot = SharedSnapshot(shm_name)
+    control = snapshot.control
+    if load_path:
+        with open(load_path, 'rb') as f:
+            game = load_snapshot(f.read())
+    else:
+        game = Game(world_size)
+    rewind = RewindBuffer()
+    clicks = spaces = rewinds = saves = 0
+    tick = 0
+    frame_time = 1.0 / FPS
+    next_frame = time.perf_counter()
+    try:
+        while not control['quit']:
+            # Apply input written by the renderer
+            bits = int(control['keys'])
+            keys = {key: bool(bits >> i & 1) for i, key in enumerate(MOVE_KEYS)}
+            aim = (float(control['aim'][0]), float(control['aim'][1]))
+            while spaces != int(control['spaces']):
+                spaces += 1
+                game.press_space()
+            if clicks != int(control['clicks']):
+                clicks = int(control['clicks'])
+                game.shoot()
+            while rewinds != int(control['rewinds']):
+                rewinds += 1
+                previous = rewind.rewind()
+                if previous:
+                    game = previous
+            if saves != int(control['saves']):
+                saves = int(control['saves'])
+                with open(QUICKSAVE_PATH, 'wb') as f:
+                    f.write(save_snapshot(game))
+                game.message_text = "Game saved!"
+                game.message_time = 120
+
+            game.update(keys, aim)
+            rewind.record(game)
+            tick += 1
+            snapshot.publish(game, tick)
+
+            # Fixed tick rate
+            next_frame += frame_time
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.perf_counter()  # Fell behind: don't try to catch up
+    finally:
+        events.stop()
+        snapshot.close()
+
+def run_renderer(world_size=None, event_dir=None, load_path=None):
+    """Render process side of two-process mode: input, drawing and nothing else."""
+    snapshot = SharedSnapshot()
+    control = snapshot.control
+    # Spawn, not fork: a forked child would inherit the renderer's SDL window and audio device
+    simulation = multiprocessing.get_context('spawn').Process(
+        target=run_simulation, args=(snapshot.name, world_size, event_dir, load_path), daemon=True)
+    simulation.start()
 
-    # Create nebulas for background
+    stars = [Star() for _ in range(120)]
     nebulas = [Nebula() for _ in range(5)]
+    effects = PostEffects()
+    bg_world = None
 
-    # Game variables
-    enemy_spawn_timer = 0
-    enemy_spawn_delay = 60  # Frames between enemy spawns
-    power_up_spawn_timer = 0
-    power_up_spawn_interval = 600  # Spawn power-up every 10 seconds
-    score = 0
-    message_text = ""
-    message_time = 0
-
-    # optional: small grain overlay surface (create once)
-    grain_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    # fill grain with few dots (cheap)
-    for _ in range(350):
-        gx = random.randint(0, WIDTH-1)
-        gy = random.randint(0, HEIGHT-1)
-        ga = random.randint(8, 24)
-        try:
-            grain_surface.set_at((gx, gy), (ga, ga, ga, ga))
-        except:
-            pass
-
-    # Main game loop
     running = True
-    while running:
-        # Handle events
+    while running and simulation.is_alive():
+        # Handle events (forwarded to the simulation)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
+                if event.key == pygame.K_SPACE:
+                    control['spaces'] += 1
+                if event.key == pygame.K_BACKSPACE:
+                    control['rewinds'] += 1
+                if event.key == pygame.K_F5:
+                    control['saves'] += 1
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                control['clicks'] += 1
+        keys = pygame.key.get_pressed()
+        control['keys'] = sum(1 << i for i, key in enumerate(MOVE_KEYS) if keys[key])
+        control['aim'] = camera.to_world(*pygame.mouse.get_pos())
+
+        # Draw the newest snapshot; redraw if the simulation overwrote it meanwhile
+        # (stars move once per frame, outside the retry loop)
+        update_stars(stars)
+        for _ in range(3):
+            acquired = snapshot.acquire()
+            if acquired is None:
+                break
+            b, seq = acquired
+            view = snapshot.view(b)
+            camera.x, camera.y = view.camera
+            if view.world_seed >= 0:
+                if bg_world is None or bg_world.seed != view.world_seed:
+                    set_world_size(view.world_size)  # A loaded snapshot may differ from --world
+                    bg_world = World(view.world_seed)
+                bg_world.load_around_camera()
+            draw_background(bg_world if view.world_seed >= 0 else None, nebulas, stars, effects)
+            draw_game(view)
+            if snapshot.is_intact(b, seq):
+                break
+
+        # Full-screen effects
+        if acquired is not None:
+            effects.observe(view.player.health, view.player.power_up_time, view.state == GAME_OVER)
+        effects.apply(screen)
 
-                if game_state == MENU and event.key == pygame.K_SPACE:
-                    game_state = PLAYING
+        # Update display
+        pygame.display.flip()
 
-                if game_state == GAME_OVER and event.key == pygame.K_SPACE:
-                    # Reset game
-                    game_state = PLAYING
-                    player = Player()
-                    bullets = []
-                    enemies = []
-                    particles = []
-                    power_ups = []
-                    score = 0
+        # Cap framerate
+        clock.tick(FPS)
 
-            if game_state == PLAYING and event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left mouse button
-                    player.shoot(bullets, particles)
+    control['quit'] = 1
+    simulation.join(timeout=1)
+    snapshot.close()
+    pygame.quit()
 
-        # Fill screen with deep blue background
-        screen.fill((8, 8, 36))
+# -----------------------
+# World snapshots (save / load, rewind, replay seeking)
+# -----------------------
+# Compact versioned binary format: a fixed header, then one packed array per entity kind.
+# Layout: magic, version, header, RNG state, message, player, bullets, enemies, particles, power-ups
+SNAPSHOT_MAGIC = b'SHTR'
+SNAPSHOT_VERSION = 2
+QUICKSAVE_PATH = os.path.join('assets', 'quicksave.snap')
+
+# state, tick, score, enemy_spawn_timer, enemy_spawn_delay, power_up_spawn_timer,
+# power_up_spawn_interval, message_time, camera x/y, world seed (-1 = no world),
+# world frame, world width/height, entity counts (bullets, enemies, parked enemies,
+# particles, power-ups, parked power-ups), message length
+SNAPSHOT_HEADER = struct.Struct('<iqiidiiiiiqqiiiiiiiiH')
+SNAPSHOT_RNG = struct.Struct('<i625Ibd')  # Game.rng.getstate(): version, key, has_gauss, gauss
+
+PLAYER_RECORD = np.dtype([
+    ('x', 'f8'), ('y', 'f8'), ('speed', 'i4'), ('angle', 'f8'), ('size', 'i4'),
+    ('health', 'i4'), ('max_health', 'i4'), ('gun_cooldown', 'i4'), ('gun_cooldown_max', 'i4'),
+    ('score', 'i4'), ('power_up_time', 'i4'), ('bullet_damage', 'i4'), ('seed', 'f8'),
+    ('power_up_type', 'i1'),  # index into POWER_UP_TYPES, -1 for none
+])
+BULLET_RECORD = np.dtype([
+    ('x', 'f8'), ('y', 'f8'), ('prev_x', 'f8'), ('prev_y', 'f8'), ('angle', 'f8'),
+    ('speed', 'i4'), ('size', 'i4'), ('damage', 'i4'), ('lifetime', 'i4'), ('seed', 'f8'),
+])
+ENEMY_RECORD = np.dtype([
+    ('x', 'f8'), ('y', 'f8'), ('prev_x', 'f8'), ('prev_y', 'f8'), ('speed', 'f8'),
+    ('size', 'i4'), ('health', 'i4'), ('color', 'u1', (3,)), ('seed', 'f8'),
+])
+PARTICLE_RECORD = np.dtype([
+    ('x', 'f8'), ('y', 'f8'), ('size', 'f8'), ('color', 'u1', (3,)), ('lifetime', 'i4'),
+    ('angle', 'f8'), ('speed', 'f8'), ('seed', 'f8'),
+])
+POWER_UP_RECORD = np.dtype([
+    ('x', 'f8'), ('y', 'f8'), ('size', 'i4'), ('lifetime', 'i4'),
+    ('pulse_dir', 'i1'), ('angle', 'f8'), ('seed', 'f8'), ('color', 'u1', (3,)),
+    ('type', 'u1'),  # index into POWER_UP_TYPES
+])
+
+def _pack(rows, record):
+    """Pack captured attribute dicts into a record array one field (column) at a time."""
+    records = np.empty(len(rows), record)
+    if not rows:
+        return records
+    for name in record.names:
+        values = map(itemgetter(name), rows)
+        if record[name].shape:
+            records[name] = list(values)
+        else:
+            records[name] = np.fromiter(values, record[name], len(rows))
+        time.sleep(0)  # Let the frame thread in between columns when encoding in the background
+    return records
+
+def _unpack(data, offset, count, record, cls):
+    """Rebuild count objects of cls from packed records, one field (column) at a time."""
+    records = np.frombuffer(data, record, count, offset)
+    columns = {}
+    for name in record.names:
+        if record[name].shape:
+            columns[name] = list(zip(*records[name].T.tolist()))  # Colors back to tuples
+        else:
+            columns[name] = records[name].tolist()
+    return bare_objects(cls, columns), offset + count * record.itemsize
 
-        # Draw nebulas
-        for nebula in nebulas:
-            nebula.draw()
+def capture_snapshot(game):
+    """Copy the game's state for encode_snapshot(): the header plus one attribute dict per entity.
 
-        # Update and draw stars
-        for star in stars:
-            star.update()
-            star.draw()
-
-        # lightly overlay grain
-        screen.blit(grain_surface, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
-
-        # Game state specific logic
-        if game_state == MENU:
-            # Draw menu (sketchy text not necessary, keep normal text)
-            draw_text("MIND-BLOWING SHOOTER", 64, WIDTH//2, HEIGHT//3, (255, 0, 128))
-            draw_text("Use WASD or Arrow Keys to move", 32, WIDTH//2, HEIGHT//2)
-            draw_text("Left Mouse Button to shoot", 32, WIDTH//2, HEIGHT//2 + 50)
-            draw_text("Press SPACE to start", 48, WIDTH//2, HEIGHT//2 + 150, (0, 255, 255))
-
-        elif game_state == PLAYING:
-            # Get keyboard state
-            keys = pygame.key.get_pressed()
-
-            # Update player
-            player.update(keys)
-
-            # Update bullets
-            for bullet in bullets[:]:
-                if bullet.update():
-                    bullets.remove(bullet)
-                else:
-                    bullet.draw()
-
-            # Spawn enemies
-            enemy_spawn_timer += 1
-            if enemy_spawn_timer >= enemy_spawn_delay:
-                enemies.append(Enemy())
-                enemy_spawn_timer = 0
-                # Decrease spawn delay over time for difficulty increase
-                enemy_spawn_delay = max(10, enemy_spawn_delay - 0.2)
-
-            # Spawn power-ups
-            power_up_spawn_timer += 1
-            if power_up_spawn_timer >= power_up_spawn_interval:
-                power_ups.append(PowerUp())
-                power_up_spawn_timer = 0
-
-            # Update power-ups
-            for power_up in power_ups[:]:
-                if power_up.update():
-                    power_ups.remove(power_up)
-                    continue
-
-                # Check collision with player
-                distance = math.hypot(power_up.x - player.x, power_up.y - player.y)
-                if distance < power_up.size + player.size // 2:
-                    # Apply power-up
-                    message_text = power_up.apply(player)
-                    message_time = 180  # Display message for 3 seconds
-
-                    # Set power-up duration
-                    player.power_up_time = 600  # 10 seconds
-                    player.power_up_type = power_up.type
-
-                    # Create collection effect
-                    for _ in range(20):
-                        particles.append(Particle(power_up.x, power_up.y, power_up.color))
-
-                    power_ups.remove(power_up)
-                    continue
-
-                power_up.draw()
-
-            # Update enemies
-            for enemy in enemies[:]:
-                enemy.update(player.x, player.y)
-
-                # Check collision with player
-                distance = math.hypot(enemy.x - player.x, enemy.y - player.y)
-                if distance < enemy.size + player.size // 2:
-                    # Player takes damage on collision
-                    if player.take_damage(10):
-                        game_state = GAME_OVER
-
-                    # Create explosion particles
-                    for _ in range(20):
-                        particles.append(Particle(enemy.x, enemy.y, enemy.color))
-
-                    enemies.remove(enemy)
-                    continue
-
-                # Check bullet collisions
-                for bullet in bullets[:]:
-                    distance = math.hypot(bullet.x - enemy.x, bullet.y - enemy.y)
-                    if distance < enemy.size + bullet.size:
-                        # Enemy takes damage
-                        if enemy.take_damage(bullet.damage):
-                            # Enemy killed
-                            score += int(enemy.size)
-
-                            # Create explosion particles
-                            for _ in range(30):
-                                particles.append(Particle(enemy.x, enemy.y, enemy.color))
-
-                            enemies.remove(enemy)
-
-                        # Remove bullet
-                        if bullet in bullets:
-                            bullets.remove(bullet)
-                        break
-
-                # Draw enemy after all checks
-                if enemy in enemies:
-                    enemy.draw()
-
-            # Update particles
-            for particle in particles[:]:
-                if particle.update():
-                    particles.remove(particle)
-                else:
-                    particle.draw()
-
-            # Draw player
-            player.draw()
-
-            # Draw score
-            draw_text(f"Score: {score}", 36, 100, 40)
-
-            # Draw active power-up indicator if one is active
-            if player.power_up_type:
-                if player.power_up_type == 'health':
-                    indicator_color = (0, 255, 0)
-                    indicator_text = "Health Boost"
-                elif player.power_up_type == 'speed':
-                    indicator_color = (0, 255, 255)
-                    indicator_text = "Speed Boost"
-                elif player.power_up_type == 'rapidfire':
-                    indicator_color = (255, 255, 0)
-                    indicator_text = "Rapid Fire"
-                elif player.power_up_type == 'damage':
-                    indicator_color = (255, 0, 0)
-                    indicator_text = "Damage Boost"
-
-                # Draw power-up name and time bar
-                draw_text(indicator_text, 24, WIDTH - 150, 40, indicator_color)
-                time_left = int((player.power_up_time / 600) * 100)
-                pygame.draw.rect(screen, (100, 100, 100), (WIDTH - 200, 60, 100, 10))
-                pygame.draw.rect(screen, indicator_color, (WIDTH - 200, 60, time_left, 10))
-
-            # Draw message if active
-            if message_time > 0:
-                # Make message fade out
-                alpha = min(255, message_time * 1.5)
-                draw_text(message_text, 36, WIDTH // 2, HEIGHT // 4, (255, 255, 255))
-                message_time -= 1
-
-        elif game_state == GAME_OVER:
-            # Draw game over screen
-            draw_text("GAME OVER", 72, WIDTH//2, HEIGHT//3, RED)
-            draw_text(f"Final Score: {score}", 48, WIDTH//2, HEIGHT//2)
-            draw_text("Press SPACE to play again", 36, WIDTH//2, HEIGHT//2 + 100)
+    Attribute values are immutable, so shallow copies are enough; this is the only part
+    that has to run on the frame thread.
+    """
+    world = game.world
+    parked_enemies = []
+    parked_power_ups = []
+    if world:
+        for key in sorted(world.chunks):  # Stable order, so equal worlds give equal bytes
+            chunk = world.chunks[key]
+            parked_enemies.extend(chunk.enemies)
+            parked_power_ups.extend(chunk.power_ups)
+
+    version, key, gauss = game.rng.getstate()
+    message = game.message_text.encode('utf-8')
+    header = SNAPSHOT_HEADER.pack(
+        game.state, game.tick, game.score, game.enemy_spawn_timer, game.enemy_spawn_delay,
+        game.power_up_spawn_timer, game.power_up_spawn_interval, game.message_time,
+        camera.x, camera.y, world.seed if world else -1, world.frame if world else 0,
+        WORLD_WIDTH, WORLD_HEIGHT,
+        len(game.bullets), len(game.enemies), len(parked_enemies), len(game.particles),
+        len(game.power_ups), len(parked_power_ups), len(message))
+    prefix = b''.join((header, SNAPSHOT_RNG.pack(version, *key, gauss is not None, gauss or 0.0), message))
+    copy = lambda objs: [obj.__dict__.copy() for obj in objs]
+    return (prefix, game.player.__dict__.copy(), copy(game.bullets), copy(game.enemies + parked_enemies),
+            copy(game.particles), copy(game.power_ups + parked_power_ups))
+
+def encode_snapshot(captured):
+    """Pack capture_snapshot() output into snapshot bytes (safe to call from any thread)."""
+    prefix, player, bullets, enemies, particles, power_ups = captured
+
+    # Strings are stored as indices
+    player_row = itemgetter(*PLAYER_RECORD.names[:-1])(player)
+    player_type = POWER_UP_TYPES.index(player['power_up_type']) if player['power_up_type'] else -1
+    player_record = np.array([player_row + (player_type,)], dtype=PLAYER_RECORD)
+    power_up_getter = itemgetter(*POWER_UP_RECORD.names[:-1])
+    power_up_records = np.array([power_up_getter(p) + (POWER_UP_TYPES.index(p['type']),) for p in power_ups],
+                                dtype=POWER_UP_RECORD) if power_ups else np.empty(0, POWER_UP_RECORD)
+
+    return b''.join((
+        SNAPSHOT_MAGIC, struct.pack('<H', SNAPSHOT_VERSION), prefix,
+        player_record.tobytes(),
+        _pack(bullets, BULLET_RECORD).tobytes(),
+        _pack(enemies, ENEMY_RECORD).tobytes(),
+        _pack(particles, PARTICLE_RECORD).tobytes(),
+        power_up_records.tobytes(),
+    ))
+
+def save_snapshot(game):
+    """Serialize the whole game (including the RNG state) to bytes."""
+    return encode_snapshot(capture_snapshot(game))
+
+def load_snapshot(data):
+    """Rebuild a Game from save_snapshot() output (also restores the RNG and world size)."""
+    if data[:4] != SNAPSHOT_MAGIC:
+        raise ValueError("not a shooter snapshot")
+    version, = struct.unpack_from('<H', data, 4)
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    offset = 6
+    (state, tick, score, enemy_spawn_timer, enemy_spawn_delay, power_up_spawn_timer,
+     power_up_spawn_interval, message_time, camera_x, camera_y, world_seed, world_frame,
+     world_width, world_height, n_bullets, n_enemies, n_parked_enemies, n_particles,
+     n_power_ups, n_parked_power_ups, message_len) = SNAPSHOT_HEADER.unpack_from(data, offset)
+    offset += SNAPSHOT_HEADER.size
+    rng = SNAPSHOT_RNG.unpack_from(data, offset)
+    offset += SNAPSHOT_RNG.size
+    message = bytes(data[offset:offset + message_len]).decode('utf-8')
+    offset += message_len
+
+    has_world = world_seed >= 0
+    set_world_size((world_width, world_height) if has_world else None)
+    game = Game()
+    if has_world:
+        game.world = World(world_seed)
+        game.world.frame = world_frame
+    game.state = state
+    game.tick = tick
+    game.score = score
+    game.enemy_spawn_timer = enemy_spawn_timer
+    game.enemy_spawn_delay = enemy_spawn_delay
+    game.power_up_spawn_timer = power_up_spawn_timer
+    game.power_up_spawn_interval = power_up_spawn_interval
+    game.message_text = message
+    game.message_time = message_time
+    camera.x, camera.y = camera_x, camera_y
+
+    (player,), offset = _unpack(data, offset, 1, PLAYER_RECORD, Player)
+    kind = player.power_up_type
+    player.power_up_type = POWER_UP_TYPES[kind] if kind >= 0 else None
+    game.player = player
+    game.bullets, offset = _unpack(data, offset, n_bullets, BULLET_RECORD, Bullet)
+    enemies, offset = _unpack(data, offset, n_enemies + n_parked_enemies, ENEMY_RECORD, Enemy)
+    game.particles, offset = _unpack(data, offset, n_particles, PARTICLE_RECORD, Particle)
+    power_ups, offset = _unpack(data, offset, n_power_ups + n_parked_power_ups, POWER_UP_RECORD, PowerUp)
+
+    # Records hold power-up types as indices
+    for power_up in power_ups:
+        power_up.type = POWER_UP_TYPES[power_up.type]
+
+    game.enemies = enemies[:n_enemies]
+    game.power_ups = power_ups[:n_power_ups]
+    if has_world:
+        # Parked entities go back into their chunks; background reloads on the next follow()
+        for enemy in enemies[n_enemies:]:
+            game.world.chunk_at(enemy.x, enemy.y).enemies.append(enemy)
+        for power_up in power_ups[n_power_ups:]:
+            game.world.chunk_at(power_up.x, power_up.y).power_ups.append(power_up)
+
+    rng_version, key, has_gauss, gauss = rng[0], rng[1:626], rng[626], rng[627]
+    game.rng.setstate((rng_version, key, gauss if has_gauss else None))
+    return game
+
+class RewindBuffer:
+    """Keyframe snapshots every `interval` ticks, newest last, at most `capacity` of them.
+
+    The frame thread only captures the state; a worker thread encodes it to bytes.
+    """
+    def __init__(self, interval=30, capacity=20):
+        self.interval = interval
+        self.frames = deque(maxlen=capacity)  # (tick, future snapshot bytes)
+        self.encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rewind')
+
+    def record(self, game):
+        if game.state == PLAYING and game.tick % self.interval == 0:
+            if not self.frames or self.frames[-1][0] != game.tick:
+                self.frames.append((game.tick, self.encoder.submit(encode_snapshot, capture_snapshot(game))))
+
+    def rewind(self):
+        """Step back to the previous keyframe; returns a Game, or None when there is none."""
+        if not self.frames:
+            return None
+        tick, data = self.frames.pop()
+        return load_snapshot(data.result())
+
+    def seek(self, tick):
+        """Game at the newest keyframe at or before tick (replay from there to reach tick exactly)."""
+        i = bisect.bisect_right([t for t, _ in self.frames], tick)
+        if i == 0:
+            return None
+        return load_snapshot(self.frames[i - 1][1].result())
 
-        # Update display
-        pygame.display.flip()
+# -----------------------
+# Main game function (logic mostly same)
+# -----------------------
+def main(world_size=None, two_process=False, load_path=None, event_dir=None):
+    init_display()
+    set_world_size(world_size)
+    if two_process:
+        run_renderer(world_size, event_dir, load_path)
+        return
+
+    if event_dir:
+        events.start(event_dir)
+
+    if load_path:
+        # Start from a saved snapshot (e.g. a heavy scenario for profiling)
+        with open(load_path, 'rb') as f:
+            game = load_snapshot(f.read())
+    else:
+        game = Game(world_size)
+
+    # Keyframes for BACKSPACE rewind
+    rewind = RewindBuffer()
 
-        # Cap framerate
-        clock.tick(FPS)
+    # Create stars for background
+    stars = [Star() for _ in range(120)]
+
+    # Create nebulas for background
+    nebulas = [Nebula() for _ in range(5)]
+
+    # Grain, flashes, shake and vignette
+    effects = PostEffects()
+
+    # Main game loop
+    running = True
+    try:
+        while running:
+            # Handle events
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+
+                    if event.key == pygame.K_SPACE:
+                        game.press_space()
+
+                    if event.key == pygame.K_BACKSPACE:
+                        # Rewind to the previous keyframe
+                        previous = rewind.rewind()
+                        if previous:
+                            game = previous
+
+                    if event.key == pygame.K_F5:
+                        # Quick save
+                        with open(QUICKSAVE_PATH, 'wb') as f:
+                            f.write(save_snapshot(game))
+                        game.message_text = "Game saved!"
+                        game.message_time = 120
+
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button == 1:  # Left mouse button
+                        game.shoot()
+
+            # Run the game rules for this frame
+            game.update(pygame.key.get_pressed())
+            rewind.record(game)
+
+            # Draw everything
+            update_stars(stars)
+            draw_background(game.world, nebulas, stars, effects)
+            draw_game(game)
+            effects.observe(game.player.health, game.player.power_up_time, game.state == GAME_OVER)
+            effects.apply(screen)
+
+            # Update display
+            pygame.display.flip()
+
+            # Cap framerate
+            clock.tick(FPS)
+    finally:
+        # Write out pending events (even if the game loop crashed)
+        events.stop()
 
     # Quit pygame
     pygame.quit()
 
+def parse_size(text):
+    """Parse a WIDTHxHEIGHT argument, e.g. 12000x8000"""
+    try:
+        w, h = text.lower().split('x')
+        return int(w), int(h)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Mind-Blowing Shooter (Sketchy Edition)")
+    parser.add_argument('--world', type=parse_size, metavar='WxH',
+                        help="play in a large scrolling arena of this size (e.g. 12000x8000)")
+    parser.add_argument('--two-process', action='store_true',
+                        help="run the simulation in its own process, sharing state through shared memory")
+    parser.add_argument('--load', metavar='FILE',
+                        help="start from a snapshot saved with F5")
+    parser.add_argument('--event-log', metavar='DIR',
+                        help="record gameplay events to DIR (summarize with: python event_log.py DIR)")
+    args = parser.parse_args()
+    main(world_size=args.world, two_process=args.two_process, load_path=args.load,
+         event_dir=args.event_log)